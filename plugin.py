@@ -6,11 +6,29 @@
 此插件使用GPL v3.0版本的许可证，作者：Unreal and 何夕。改编时请保留此声明
 """
 import os
+import itertools
 import json
+import asyncio
+import functools
+import math
+import mmap
+import operator
 import random
 import time
 import re
-from typing import Dict, Any, Set, Optional, List, Tuple, Union, Type
+import sys
+import types
+from typing import Dict, Any, Set, Optional, List, Tuple, Union, Type, Iterable, Callable
+
+# 可选依赖：未安装时回退到标准库实现
+try:
+    import ahocorasick  # pyahocorasick
+except ImportError:
+    ahocorasick = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # MaiBot 核心导入
 from src.plugin_system import (
@@ -22,27 +40,29 @@ from src.plugin_system import (
 from src.plugin_system.apis import chat_api, send_api
 
 # - 军衔定义 -
-RANKS = [
-    {"name": "元帅", "level": 11},
+RANK_LEVELS: Dict[str, int] = {
+    "元帅": 11,
     # 将官
-    {"name": "上将", "level": 10},
-    {"name": "中将", "level": 9},
-    {"name": "少将", "level": 8},
+    "上将": 10,
+    "中将": 9,
+    "少将": 8,
     # 校官
-    {"name": "大校", "level": 7},
-    {"name": "上校", "level": 6},
-    {"name": "中校", "level": 5},
-    {"name": "少校", "level": 4},
+    "大校": 7,
+    "上校": 6,
+    "中校": 5,
+    "少校": 4,
     # 尉官
-    {"name": "上尉", "level": 3},
-    {"name": "中尉", "level": 2},
-    {"name": "少尉", "level": 1},
-]
-RANK_NAMES = [r["name"] for r in RANKS]
-RANK_LEVELS = {r["name"]: r["level"] for r in RANKS}
+    "上尉": 3,
+    "中尉": 2,
+    "少尉": 1,
+}
+# 用于成员判断的集合，以及按等级从高到低排列的 (军衔, 等级) 元组
+RANK_NAMES = frozenset(RANK_LEVELS)
+RANKS_ORDERED: Tuple[Tuple[str, int], ...] = tuple(sorted(RANK_LEVELS.items(), key=lambda kv: -kv[1]))
+# 无效军衔提示中列出的可用军衔，固定不变，预先拼接
+_RANK_NAMES_JOINED = ", ".join(name for name, _ in RANKS_ORDERED)
 
 # - 国家制度定义 -
-IDEOLOGIES = ["民主", "共和", "君主", "社会主义", "资本主义", "军国主义", "无政府主义", "联邦", "独裁", "人民代表大会", "FXS"]
 IDEOLOGY_EFFECTS = {
     "民主": "提高国民幸福度，但可能降低战争效率。",
     "共和": "平衡发展各项指标。",
@@ -56,6 +76,11 @@ IDEOLOGY_EFFECTS = {
     "人民代表大会": "代表民意，但效率可能受程序影响。",
     "FXS": "极端政治立场。"
 }
+# 制度列表由效果表派生，保证两者始终一致（保持定义顺序）
+IDEOLOGIES: Tuple[str, ...] = tuple(IDEOLOGY_EFFECTS)
+# 成员判断用集合，无效制度提示中的列表预先拼接
+IDEOLOGY_NAMES = frozenset(IDEOLOGY_EFFECTS)
+_IDEOLOGIES_JOINED = ", ".join(IDEOLOGIES)
 
 # - 随机事件定义 -
 RANDOM_EVENTS = [
@@ -68,93 +93,223 @@ RANDOM_EVENTS = [
     {"name": "人口增长", "effect": "nation.population", "multiplier": 1.1, "description": "移民潮涌入，国家人口增长了10%。"},
     {"name": "人口减少", "effect": "nation.population", "multiplier": 0.9, "description": "战争或疾病导致人口减少，国家人口下降了10%。"},
 ]
+# 结果不允许低于 1 的国家属性
+_EVENT_FLOORED_STATS = frozenset(("troops", "territory", "population"))
+
+def _compile_events(events: List[Dict[str, Any]]) -> Tuple[Tuple[str, str, str, float, bool], ...]:
+    """
+    模块加载时预先解析事件的 effect 路径 (例如 "nation.troops")，
+    生成 (名称, 描述, 国家属性名, 倍率, 是否限制最小值为 1) 元组，路径无效的事件在此丢弃。
+    """
+    compiled = []
+    for event in events:
+        effect_path = event["effect"].split('.')
+        if len(effect_path) != 2 or effect_path[0] != 'nation':
+            print(f"随机事件 '{event['name']}' 的 effect 路径无效: {event['effect']}")
+            continue
+        stat_key = effect_path[1]
+        compiled.append((event["name"], event["description"], stat_key, event["multiplier"],
+                         stat_key in _EVENT_FLOORED_STATS))
+    return tuple(compiled)
+
+_COMPILED_EVENTS = _compile_events(RANDOM_EVENTS)
+
+# - JSON 编解码 -
+def _json_default(obj: Any) -> Any:
+    """序列化时的兜底转换：国家成员、盟约等集合转为列表"""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"无法序列化的类型: {type(obj).__name__}")
+
+def _json_dumps(obj: Any) -> bytes:
+    """序列化为紧凑的 UTF-8 JSON 字节串（不缩进），优先使用 orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_json_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _json_loads(raw: bytes) -> Any:
+    """解析 UTF-8 编码的 JSON 字节串，优先使用 orjson"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _json_load_file(path: str) -> Any:
+    """
+    读取并解析 JSON 文件。
+    使用 orjson 时将文件只读映射到内存 (mmap) 后直接解析，省去把整个文件复制成 bytes 的一次拷贝；
+    标准库 json 不接受 memoryview，仍按普通方式读取。
+    """
+    with open(path, 'rb') as f:
+        if orjson is None or os.fstat(f.fileno()).st_size == 0:
+            return _json_loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
 
 # - 静态辅助方法 -
+# 游戏数据由 _load_game_data 保证含有 players / nations 键，以下查询直接索引，不再每次构造空字典作默认值
 def get_player_info(game_state: Dict[str, Any], user_id: str) -> Optional[Dict[str, Any]]:
     """获取玩家信息"""
-    return game_state.get("players", {}).get(user_id)
+    return game_state["players"].get(user_id)
 
 def get_player_nation(game_state: Dict[str, Any], user_id: str) -> Optional[str]:
     """根据用户ID获取其所属国家名称"""
-    player_info = get_player_info(game_state, user_id)
+    player_info = game_state["players"].get(user_id)
     return player_info.get("nation") if player_info else None
 
 def get_nation_info(game_state: Dict[str, Any], nation_name: str) -> Optional[Dict[str, Any]]:
     """根据国家名称获取国家信息"""
-    return game_state.get("nations", {}).get(nation_name)
+    return game_state["nations"].get(nation_name)
+
+# 战斗与驻军用到的数值字段及其默认值，加载存档时统一补齐，命令中直接用 [] 读取
+_NATION_NUMERIC_DEFAULTS = (("troops", 0), ("deployed_troops", 0), ("territory", 15), ("elo", 1500))
+
+def get_nation_names(game_state: Dict[str, Any]) -> Tuple[str, ...]:
+    """获取所有国家名称的元组，缓存为派生键 _nation_names"""
+    # 国家只会新增不会删除，数量不变即说明缓存仍然有效
+    nations = game_state["nations"]
+    names = game_state.get("_nation_names")
+    if names is None or len(names) != len(nations):
+        names = game_state["_nation_names"] = tuple(nations)
+    return names
 
 def are_allies(game_state: Dict[str, Any], nation1: str, nation2: str) -> bool:
     """检查两个国家是否是盟友"""
-    alliances = game_state.get("alliances", set())
-    if not isinstance(alliances, set):
-        # 兼容旧数据格式（列表）
-        alliances = set(frozenset(a) for a in alliances) if isinstance(alliances, list) else set()
+    return nation2 in game_state["alliances"].get(nation1, ())
 
+def build_ally_index(alliances: Iterable[Iterable[str]]) -> Dict[str, Set[str]]:
+    """由存档中的盟约列表（每项为一组国家）构建 国家 -> 盟友集合 的邻接表"""
+    index: Dict[str, Set[str]] = {}
     for alliance in alliances:
-        if isinstance(alliance, (list, tuple, set, frozenset)):
-             if nation1 in alliance and nation2 in alliance:
-                 return True
-    return False
+        members = set(alliance)
+        for nation in members:
+            index.setdefault(nation, set()).update(members - {nation})
+    return index
+
+def alliance_pairs(alliances: Dict[str, Set[str]]) -> List[List[str]]:
+    """将邻接表还原为存档使用的盟约列表，每对盟国只输出一次"""
+    return [[nation, ally] for nation, allies in alliances.items() for ally in allies if nation < ally]
+
+def add_alliance(game_state: Dict[str, Any], nation1: str, nation2: str):
+    """结盟，双方互相加入对方的盟友集合"""
+    alliances = game_state["alliances"]
+    alliances.setdefault(nation1, set()).add(nation2)
+    alliances.setdefault(nation2, set()).add(nation1)
+
+def remove_alliance(game_state: Dict[str, Any], nation1: str, nation2: str):
+    """解除盟约，双方互相移出对方的盟友集合"""
+    alliances = game_state["alliances"]
+    for nation, ally in ((nation1, nation2), (nation2, nation1)):
+        allies = alliances.get(nation)
+        if allies is not None:
+            allies.discard(ally)
+            if not allies:
+                del alliances[nation]
+
+def build_leader_index(players: Dict[str, Any], nations: Dict[str, Any]) -> Dict[str, str]:
+    """由国家的 leader 字段构建 玩家ID -> 其领导的国家 的索引（只收录领导自己所在国家的玩家）"""
+    index: Dict[str, str] = {}
+    for nation_name, nation in nations.items():
+        leader = nation.get("leader")
+        if leader and players.get(leader, {}).get("nation") == nation_name:
+            index[leader] = nation_name
+    return index
+
+def is_nation_leader(game_state: Dict[str, Any], user_id: str, nation_name: str) -> bool:
+    """检查玩家是否是其所在国家的领袖，一次字典查询，无需先取国家信息"""
+    return game_state["_leaders"].get(user_id) == nation_name
 
 def format_player_info(user_id: str, player_info: Optional[Dict[str, Any]], nation_info: Optional[Dict[str, Any]]) -> str:
     """格式化玩家信息字符串"""
     if not player_info:
         return "你尚未加入任何国家。请使用 /join <国家名> 加入。"
-    deployed_str = f" (驻扎 {nation_info.get('deployed_troops', 0)} 兵力)" if nation_info and nation_info.get('deployed_troops', 0) > 0 else ""
-    total_troops_str = f" (国家总兵力: {nation_info['troops']})" if nation_info else ""
-    return (
-        f"👤 玩家ID: {user_id}\n"
-        f"🎖️ 军衔: {player_info.get('rank', '士兵')}\n"
-        f"🌍 国家: {player_info['nation']}{deployed_str}{total_troops_str}"
-    )
+    rank = player_info.get('rank', '士兵')
+    nation = player_info['nation']
+    if nation_info is not None:
+        deployed = nation_info.get('deployed_troops', 0)
+        troops = nation_info.get('troops', 0)
+        deployed_str = f" (驻扎 {deployed} 兵力)" if deployed > 0 else ""
+        total_troops_str = f" (国家总兵力: {troops})"
+    else:
+        deployed_str = total_troops_str = ""
+    return f"👤 玩家ID: {user_id}\n🎖️ 军衔: {rank}\n🌍 国家: {nation}{deployed_str}{total_troops_str}"
 
 def get_allies(game_state: Dict[str, Any], player_nation: str) -> List[str]:
     """获取玩家国家的所有盟友"""
-    allies = []
-    alliances = game_state.get("alliances", set())
-    if not isinstance(alliances, set):
-        # 兼容旧数据格式（列表）
-        alliances = set(frozenset(a) for a in alliances) if isinstance(alliances, list) else set()
-
-    for alliance in alliances:
-        if isinstance(alliance, (list, tuple, set, frozenset)):
-            if player_nation in alliance:
-                allies.extend([n for n in alliance if n != player_nation])
-    return allies
+    return list(game_state["alliances"].get(player_nation, ()))
+
+# 帮助菜单是固定文本，模块加载时构建一次
+_HELP_MENU = (
+    "🌍 世界大战模拟器 帮助菜单 🌍\n"
+    "可用命令列表：\n"
+    "/join <国家名> - 加入或创建一个国家\n"
+    "/my - 查看自己的信息\n"
+    "/friends - 查看当前的友军列表\n"
+    "/pvp <国家名> <出兵数量> - 对指定国家发起战斗\n"
+    "/conquer <国家名> <出兵数量> - 对指定国家发起掠夺领土\n"
+    "/ally <国家名> - 与指定国家结盟\n"
+    "/withdraw <国家名> - 解除与指定国家的盟友关系\n"
+    "/deploy <数量> - 在自己的领土上驻军 (正数部署，负数撤回)\n"
+    "/transfer <用户ID> <兵力数量> - (领袖) 将国家兵力转移给同国玩家\n"
+    "/appoint <用户ID> <军衔> - (领袖) 任命官职\n"
+    "/set_ideology <制度> - (领袖) 设置国家制度\n"
+    "/nation - 查看自己国家的信息\n"
+    "/world - 查看世界现状\n"
+    "/help - 显示此帮助菜单\n"
+    "提示：战斗和掠夺时，防守方的有效兵力是其国家总兵力减去驻军数量。"
+)
 
 def format_help_menu() -> str:
     """格式化帮助菜单字符串"""
-    help_text = (
-        "🌍 世界大战模拟器 帮助菜单 🌍\n"
-        "可用命令列表：\n"
-        "/join <国家名> - 加入或创建一个国家\n"
-        "/my - 查看自己的信息\n"
-        "/friends - 查看当前的友军列表\n"
-        "/pvp <国家名> <出兵数量> - 对指定国家发起战斗\n"
-        "/conquer <国家名> <出兵数量> - 对指定国家发起掠夺领土\n"
-        "/ally <国家名> - 与指定国家结盟\n"
-        "/withdraw <国家名> - 解除与指定国家的盟友关系\n"
-        "/deploy <数量> - 在自己的领土上驻军 (正数部署，负数撤回)\n"
-        "/transfer <用户ID> <兵力数量> - (领袖) 将国家兵力转移给同国玩家\n"
-        "/appoint <用户ID> <军衔> - (领袖) 任命官职\n"
-        "/set_ideology <制度> - (领袖) 设置国家制度\n"
-        "/nation - 查看自己国家的信息\n"
-        "/world - 查看世界现状\n"
-        "/help - 显示此帮助菜单\n"
-        "提示：战斗和掠夺时，防守方的有效兵力是其国家总兵力减去驻军数量。"
-    )
-    return help_text
+    return _HELP_MENU
 
 # 计算 Elo 等级分变化
+# 10 ** (x / 400) == exp(x * ln(10) / 400)，常数预先算好
+_ELO_SCALE = math.log(10) / 400.0
+
 def calculate_elo_change(rating_a: float, rating_b: float, score_a: float, k_factor: float = 32.0) -> Tuple[float, float]:
-    """计算 Elo 等级分变化"""
-    expected_score_a = 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
-    expected_score_b = 1 / (1 + 10 ** ((rating_a - rating_b) / 400))
-    actual_score_a = score_a
-    actual_score_b = 1 - score_a
-    delta_a = k_factor * (actual_score_a - expected_score_a)
-    delta_b = k_factor * (actual_score_b - expected_score_b)
-    return delta_a, delta_b
+    """计算 Elo 等级分变化（双方期望得分之和为 1，因此变化量互为相反数）"""
+    expected_score_a = 1.0 / (1.0 + math.exp((rating_b - rating_a) * _ELO_SCALE))
+    delta_a = k_factor * (score_a - expected_score_a)
+    return delta_a, -delta_a
+
+def apply_elo_result(nation_a: Dict[str, Any], nation_b: Dict[str, Any], score_a: float, k_factor: float = 32.0):
+    """按一场对战的结果同时更新两个国家的 Elo 评分（最低 100）"""
+    rating_a = nation_a["elo"]
+    rating_b = nation_b["elo"]
+    delta_a, delta_b = calculate_elo_change(rating_a, rating_b, score_a, k_factor)
+    nation_a["elo"] = max(100, rating_a + delta_a)
+    nation_b["elo"] = max(100, rating_b + delta_b)
+
+# 战斗专用的随机数生成器，可单独设定种子复现战斗
+_BATTLE_RNG = random.Random()
+_battle_random = _BATTLE_RNG.random
+
+def roll_battle(attack_troops: int, defense_troops: int) -> bool:
+    """掷一次战斗骰：双方兵力各乘以 [0.8, 1.2) 的随机系数，进攻方战力高于防守方时返回 True"""
+    attack_power = attack_troops * (0.8 + 0.4 * _battle_random())
+    defense_power = defense_troops * (0.8 + 0.4 * _battle_random())
+    return attack_power > defense_power
+
+def resolve_engagement(attack_troops: int, defense_troops: int, defender_total: int,
+                       heavy_rate: float, light_rate: float) -> Tuple[bool, int, int]:
+    """
+    结算一次交战（战斗与掠夺共用）：掷骰决定胜负，并计算双方的兵力损失。
+    胜方按自身出战兵力的 heavy_rate 造成伤害，败方按 light_rate 造成伤害，损失不超过对方可承受的兵力。
+    Args:
+        attack_troops: 进攻方出兵数量。
+        defense_troops: 防守方有效兵力（总兵力减去驻军，至少为 1）。
+        defender_total: 防守方国家总兵力。
+        heavy_rate: 胜方造成伤害的比例。
+        light_rate: 败方造成伤害的比例。
+    Returns:
+        (进攻方是否获胜, 进攻方损失兵力, 防守方损失兵力)
+    """
+    if roll_battle(attack_troops, defense_troops):
+        return (True, min(int(defense_troops * light_rate), attack_troops),
+                min(int(attack_troops * heavy_rate), defender_total))
+    return (False, min(int(defense_troops * heavy_rate), attack_troops),
+            min(int(attack_troops * light_rate), defense_troops))
 
 # --- 隐蔽的违禁词列表 ---
 # 请根据实际情况扩展此列表
@@ -170,23 +325,365 @@ _b_w_l_ = {
 # --- 违禁词列表结束 ---
 
 # --- 违禁词检测函数 ---
-def contains_banned_words(text: str, banned_words: Set[str] = _b_w_l_) -> bool:
+# 纯 ASCII 违禁词要求两侧不是 ASCII 单词字符，避免 "Shackleton" 因含 "hack" 被误判；
+# 中文等非 ASCII 违禁词两侧没有单词边界可言，按子串匹配
+_ASCII_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789_")
+
+def _compile_banned_pattern(banned_words: Set[str]) -> "re.Pattern[str]":
+    """将违禁词集合编译为正则模式，词表统一转为小写，匹配时对小写化后的文本区分大小写匹配"""
+    ascii_words = [re.escape(word.lower()) for word in banned_words if word.isascii()]
+    other_words = [re.escape(word.lower()) for word in banned_words if not word.isascii()]
+    alternatives = []
+    if ascii_words:
+        alternatives.append(r'(?<![0-9a-z_])(?:' + '|'.join(ascii_words) + r')(?![0-9a-z_])')
+    if other_words:
+        alternatives.append(r'(?:' + '|'.join(other_words) + r')')
+    return re.compile('|'.join(alternatives) or r'(?!)')
+
+def _build_banned_automaton(banned_words: Set[str]):
+    """构建 Aho–Corasick 自动机，扫描耗时只与文本长度有关，与词表大小无关；值为 (词长, 是否需要检查边界)"""
+    automaton = ahocorasick.Automaton()
+    for word in banned_words:
+        automaton.add_word(word.lower(), (len(word.lower()), word.isascii()))
+    automaton.make_automaton()
+    return automaton
+
+def _automaton_hit(automaton, lowered: str) -> bool:
+    """自动机扫描小写化文本，纯 ASCII 违禁词只在两侧都是单词边界时算命中"""
+    for end, (length, needs_boundary) in automaton.iter(lowered):
+        if not needs_boundary:
+            return True
+        start = end - length + 1
+        if (start == 0 or lowered[start - 1] not in _ASCII_WORD_CHARS) and \
+                (end + 1 == len(lowered) or lowered[end + 1] not in _ASCII_WORD_CHARS):
+            return True
+    return False
+
+# 模块加载时预编译一次，避免每次检测都重新转义并编译
+_BANNED_RE = _compile_banned_pattern(_b_w_l_)
+_BANNED_AC = _build_banned_automaton(_b_w_l_) if ahocorasick is not None and _b_w_l_ else None
+# 所有违禁词首字符（含大小写）：文本中一个都没出现时不可能命中，可直接放行
+_BANNED_FIRST_CHARS = frozenset(w[0].lower() for w in _b_w_l_) | frozenset(w[0].upper() for w in _b_w_l_)
+
+def contains_banned_words(text: str, banned_words: Optional[Set[str]] = None) -> bool:
     """
     检查文本中是否包含违禁词。
     Args:
         text (str): 要检查的文本。
-        banned_words (Set[str]): 违禁词集合 (默认使用 _b_w_l_)。
+        banned_words (Optional[Set[str]]): 自定义违禁词集合 (默认使用预编译的 _b_w_l_)。
     Returns:
         bool: 如果包含违禁词返回 True，否则返回 False。
     """
+    if banned_words is None:
+        if _BANNED_FIRST_CHARS.isdisjoint(text):
+            return False
+        lowered = text.lower()
+        if _BANNED_AC is not None:
+            return _automaton_hit(_BANNED_AC, lowered)
+        return bool(_BANNED_RE.search(lowered))
     if not banned_words:
         return False
-    # 转义特殊字符并组合成一个正则模式，进行忽略大小写的完整单词匹配
-    escaped_words = [re.escape(word) for word in banned_words]
-    pattern = r'\b(?:' + '|'.join(escaped_words) + r')\b'
-    return bool(re.search(pattern, text, re.IGNORECASE))
+    return bool(_compile_banned_pattern(banned_words).search(text.lower()))
 # --- 违禁词检测函数结束 ---
 
+# - 游戏数据缓存 -
+class _GameState:
+    """
+    进程内共享的游戏数据。
+    命令组件由框架按消息实例化，拿不到插件实例，因此统一通过此类读写同一份内存数据。
+    每次修改只向日志文件 (<data_file>.log) 追加一行本次变动的记录，并标记数据为脏；
+    第一次修改后等待 flush_delay 秒再写一次完整快照并清空日志，期间的修改合并进同一次快照，
+    插件卸载时立即写快照。加载时在快照之上重放日志。
+    """
+    data_file: str = "./World/data/game_data.json"
+    data: Optional[Dict[str, Any]] = None
+    lock = asyncio.Lock()
+    # 首次修改后延迟多少秒写完整快照
+    flush_delay: float = 1.0
+    dirty: bool = False
+    # 每次修改递增的数据版本号，供按版本缓存的渲染结果判断是否过期
+    version: int = 0
+    _journal = None
+    _flush_task: Optional[asyncio.Task] = None
+    # 延迟任务是否仍停在 sleep 中；只有这时取消它才不会打断正在进行的保存
+    _flush_sleeping: bool = False
+    # 正在线程中执行的快照写入；同一时间只允许一个写入
+    _write_future: Optional[asyncio.Future] = None
+
+    @classmethod
+    def _load_from_disk(cls) -> Dict[str, Any]:
+        """读取快照并重放日志；数据尚未共享给任何命令，可以在线程中执行"""
+        data = WorldWarPlugin._load_game_data(cls.data_file)
+        journal_file = cls.data_file + ".log"
+        # 重放过的日志已合并进内存数据，立即落盘为快照后清空
+        if os.path.exists(journal_file) and os.path.getsize(journal_file) > 0:
+            if WorldWarPlugin._save_game_data(data, cls.data_file):
+                open(journal_file, 'wb').close()
+        return data
+
+    @classmethod
+    def get(cls) -> Dict[str, Any]:
+        """获取内存中的游戏数据，首次访问时从文件加载"""
+        if cls.data is None:
+            cls.data = cls._load_from_disk()
+            cls.version += 1
+        return cls.data
+
+    @classmethod
+    async def aget(cls) -> Dict[str, Any]:
+        """
+        get 的协程版本，供命令与动作使用。
+        数据已在内存中时直接返回；首次加载的磁盘读取与解析交给线程，不阻塞事件循环。
+        """
+        if cls.data is None:
+            async with cls.lock:
+                # 等锁期间可能已由其他协程完成加载
+                if cls.data is None:
+                    cls.data = await asyncio.to_thread(cls._load_from_disk)
+                    cls.version += 1
+        return cls.data
+
+    @classmethod
+    async def commit(cls, nations: Iterable[str] = (), players: Iterable[str] = (),
+                     alliances: bool = False, last_event_time: bool = False):
+        """
+        记录一次数据修改：只把涉及的国家、玩家等条目追加写入日志。
+        Args:
+            nations: 被修改的国家名称。
+            players: 被修改的玩家ID。
+            alliances: 盟约是否发生变化。
+            last_event_time: 随机事件时间戳是否发生变化。
+        """
+        data = cls.get()
+        entry: Dict[str, Any] = {}
+        if nations:
+            entry["nations"] = {n: data["nations"][n] for n in nations if n in data["nations"]}
+        if players:
+            entry["players"] = {u: data["players"][u] for u in players if u in data["players"]}
+        if alliances:
+            entry["alliances"] = alliance_pairs(data["alliances"])
+        if last_event_time:
+            entry["last_event_time"] = data["last_event_time"]
+        if not entry:
+            return
+        cls.version += 1
+        async with cls.lock:
+            # 修改已经生效，写日志失败时只记录错误，仍标记为脏，由随后的完整快照落盘
+            cls.dirty = True
+            try:
+                if cls._journal is None:
+                    os.makedirs(os.path.dirname(cls.data_file) or ".", exist_ok=True)
+                    cls._journal = open(cls.data_file + ".log", 'ab', buffering=0)
+                cls._journal.write(_json_dumps(entry) + b"\n")
+            except Exception as e:
+                print(f"写入修改日志失败: {e}")
+                cls._close_journal()
+        cls._schedule_flush()
+
+    @classmethod
+    def _close_journal(cls):
+        """关闭出错的日志文件句柄，下次修改时重新打开"""
+        if cls._journal is not None:
+            try:
+                cls._journal.close()
+            except Exception:
+                pass
+            cls._journal = None
+
+    @classmethod
+    def _schedule_flush(cls):
+        """启动延迟写快照的任务，已有任务在等待时直接复用"""
+        if cls._flush_task is None or cls._flush_task.done():
+            cls._flush_task = asyncio.create_task(cls._flush_later())
+
+    @classmethod
+    async def _flush_later(cls):
+        cls._flush_sleeping = True
+        try:
+            await asyncio.sleep(cls.flush_delay)
+        finally:
+            cls._flush_sleeping = False
+        if cls.dirty:
+            await cls.save()
+
+    @classmethod
+    async def flush(cls):
+        """立即写快照，用于插件卸载：延迟任务还在等待时取消它，已开始保存时等它完成"""
+        task = cls._flush_task
+        if task is not None and not task.done() and task is not asyncio.current_task():
+            if cls._flush_sleeping:
+                task.cancel()
+            else:
+                await asyncio.wait({task})
+        cls._flush_task = None
+        await cls.save()
+
+    @classmethod
+    async def save(cls):
+        """将内存中的游戏数据完整写回文件，并清空已合并的日志；自上次快照以来没有修改时直接返回"""
+        if cls.data is None or not cls.dirty:
+            return
+        async with cls.lock:
+            # 上一次保存被取消时，它的线程可能仍在写文件，先等它结束
+            if cls._write_future is not None and not cls._write_future.done():
+                await asyncio.wait({cls._write_future})
+            # 序列化必须在事件循环线程中完成（命令随时可能修改数据），磁盘写入交给线程，不阻塞其他命令
+            try:
+                payload = WorldWarPlugin._encode_game_data(cls.data)
+            except Exception as e:
+                print(f"保存游戏数据失败: {e}")
+                return
+            # shield: 保存被取消时线程里的写入无法中止，记下它供下一次保存等待
+            cls._write_future = asyncio.ensure_future(
+                asyncio.to_thread(WorldWarPlugin._write_game_file, payload, cls.data_file))
+            if await asyncio.shield(cls._write_future):
+                try:
+                    if cls._journal is not None:
+                        cls._journal.truncate(0)
+                    elif os.path.exists(cls.data_file + ".log"):
+                        open(cls.data_file + ".log", 'wb').close()
+                except Exception as e:
+                    # 快照已包含全部修改，日志清空失败只会在下次加载时被重复重放
+                    print(f"清空修改日志失败: {e}")
+                    cls._close_journal()
+                cls.dirty = False
+
+# 快照临时文件的序号
+_TMP_COUNTER = itertools.count()
+
+# /world 按总兵力排序的键
+_BY_FIRST = operator.itemgetter(0)
+
+# - 国家信息卡片缓存 -
+@functools.lru_cache(maxsize=256)
+def _render_nation_card(nation_name: str, version: int) -> str:
+    """
+    渲染 /nation 显示的国家信息。
+    以 (国家名, 数据版本号) 为键缓存，数据没有任何修改时重复查看直接返回缓存结果；
+    version 只参与缓存键，由调用方传入 _GameState.version。
+    """
+    game_data = _GameState.get()
+    nation_info = game_data["nations"][nation_name]
+    # 领袖通常存在，直接索引；缺失时由异常分支兜底，命中路径不再构造空字典
+    try:
+        leader_name = game_data["players"][nation_info["leader"]]["user_id"]
+    except (KeyError, TypeError):
+        leader_name = "未知"
+    members_count = len(nation_info.get("members", []))
+    allies_list = get_allies(game_data, nation_name)
+    allies_str = ", ".join(allies_list) if allies_list else "无"
+
+    nation_info_str = (
+        f"🌍 国家信息: {nation_name}\n"
+        f"🎖️ 领袖: {leader_name}\n"
+        f"👥 成员数: {members_count}\n"
+        f"⚔️ 总兵力: {nation_info.get('troops', 0)}\n"
+        f"🗺️ 领土: {nation_info.get('territory', 0)}\n"
+        f"👥 人口: {nation_info.get('population', 0)}\n"
+        f"🏛️ 制度: {nation_info.get('ideology', '未定')}\n"
+        f"🏕️ 驻军: {nation_info.get('deployed_troops', 0)}\n"
+        f"📈 Elo评分: {nation_info.get('elo', 1500)}\n"
+        f"🤝 盟友: {allies_str}\n"
+    )
+
+    return nation_info_str
+
+# - 公屏公告批量发送 -
+class _Announcer:
+    """
+    公屏公告的合并发送器。
+    公告先进入待发送列表，第一条到达后等待 flush_interval 秒，期间到达的同群公告合并为一条消息发出，
+    命令本身不再等待网络往返，突发的大量公告也只产生少量发送请求。
+    """
+    flush_interval: float = 0.5
+    # 单条合并消息最多包含的公告数
+    max_batch: int = 20
+    _pending: List[Tuple[str, str]] = []
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def put(cls, chat_id: str, message: str):
+        """加入一条待发送的公告，必要时启动延迟发送任务"""
+        cls._pending.append((chat_id, message))
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._flush_later())
+
+    @classmethod
+    async def _flush_later(cls):
+        await asyncio.sleep(cls.flush_interval)
+        await cls.flush()
+
+    @classmethod
+    async def flush(cls):
+        """立即发送所有待发送的公告"""
+        batch, cls._pending = cls._pending, []
+        grouped: Dict[str, List[str]] = {}
+        for chat_id, message in batch:
+            grouped.setdefault(chat_id, []).append(message)
+        for chat_id, messages in grouped.items():
+            for i in range(0, len(messages), cls.max_batch):
+                text = "\n".join(messages[i:i + cls.max_batch])
+                try:
+                    # 使用 send_api 发送消息到指定群聊
+                    await send_api.send_to_chat_stream(chat_id, text)
+                    print(f"已广播到公屏 ({chat_id}): {text}")
+                except Exception as e:
+                    print(f"广播到公屏失败: {e}")
+
+# - 配置缓存 -
+class _Config:
+    """
+    缓存的游戏配置项。
+    配置在运行期间不会变化，首次访问时读取一次，之后命令直接读取属性，
+    不再每次都按点号路径逐层查找配置字典。
+    """
+    values: Optional[types.SimpleNamespace] = None
+
+    @classmethod
+    def get(cls, component: Any) -> types.SimpleNamespace:
+        """获取缓存的配置，component 为任意提供 get_config 的插件或组件实例"""
+        if cls.values is None:
+            cls.values = types.SimpleNamespace(
+                initial_troops=component.get_config("game.initial_troops", 1000),
+                initial_territory=component.get_config("game.initial_territory", 15),
+                initial_population=component.get_config("game.initial_population", 1000000),
+                elo_k=component.get_config("game.elo_k_factor", 32.0),
+                announce_enabled=component.get_config("game.enable_public_announcements", True),
+                announce_chat=component.get_config("game.announcement_chat_id", "12345678"),
+                event_min=component.get_config("game.event_interval_min", 60),
+                event_max=component.get_config("game.event_interval_max", 120),
+            )
+        return cls.values
+
+# - 通用提示消息 -
+# 多个命令共用的固定提示文本，需要嵌入玩家输入或数值的提示仍在各命令中用 f-string 构造
+_MSG_NO_USER_OR_MESSAGE = "无法获取用户信息或消息内容。"
+_MSG_NO_USER_INFO = "无法获取用户信息。"
+_MSG_NOT_JOINED = "你尚未加入任何国家。"
+_MSG_TROOPS_NOT_INT = "出兵数量必须是一个整数。"
+_MSG_TROOPS_NOT_POSITIVE = "出兵数量必须大于0。"
+
+# /world 输出中的固定文本
+_EMPTY_WORLD_MSG = "🌍 当前世界地图上还没有任何国家。快使用 /join <国家名> 创建或加入一个吧！"
+_WORLD_HEADER = "🌍 世界现状概览 🌍"
+_WORLD_SEPARATOR = "-" * 30
+
+# - 命令参数解析 -
+# 参数格式固定为 "命令词 + 名称 + 整数" 之类的简单结构，直接用 str.split 拆分，不再经过正则
+def _split_command_args(raw_message: str, verb: str) -> Optional[str]:
+    """取出 /<verb> 之后的参数部分；命令词不符或没有参数时返回 None"""
+    parts = raw_message.split(None, 1)
+    if len(parts) != 2 or parts[0] != "/" + verb:
+        return None
+    return parts[1]
+
+def _split_name_and_amount(args: str) -> Optional[Tuple[str, str]]:
+    """将 "<名称> <数字>" 拆为 (名称, 数字串)，名称中可以包含空格；格式不符时返回 None"""
+    pieces = args.rsplit(None, 1)
+    if len(pieces) != 2 or not pieces[1].isdecimal():
+        return None
+    return pieces[0], pieces[1]
+
 # - 插件主类 -
 @register_plugin
 class WorldWarPlugin(BasePlugin):
@@ -205,8 +702,8 @@ class WorldWarPlugin(BasePlugin):
         super().__init__(*args, **kwargs)
         
         # 定义游戏数据文件路径 (使用相对路径)
-        self.data_file = "./World/data/game_data.json" 
-        # 初始化游戏状态 (在 on_load 时会从文件加载)
+        self.data_file = _GameState.data_file
+        # 初始化游戏状态 (在 on_load 时会从文件加载，与命令组件共享同一份数据)
         self.game_state: Optional[Dict[str, Any]] = None
 
     # --- 实现抽象基类要求的方法 ---
@@ -258,12 +755,25 @@ class WorldWarPlugin(BasePlugin):
                 "enable_nation_command": ConfigField(type=bool, default=True, description="是否启用国家信息命令"),
                 "enable_world_command": ConfigField(type=bool, default=True, description="是否启用世界现状命令"), # 新增配置项
                 "enable_random_event_action": ConfigField(type=bool, default=True, description="是否启用随机事件 Action"),
+                "enable_command_router": ConfigField(type=bool, default=True, description="是否将所有命令合并为一个组件注册（关闭则逐个注册）"),
             }
         }
 
     @property
     def python_dependencies(self) -> list:
-        return []
+        return [
+            PythonDependency(
+                package_name="ahocorasick",
+                install_name="pyahocorasick",
+                optional=True,
+                description="违禁词多模式匹配加速，未安装时回退到正则",
+            ),
+            PythonDependency(
+                package_name="orjson",
+                optional=True,
+                description="游戏数据读写加速，未安装时回退到标准库 json",
+            ),
+        ]
 
     @property
     def dependencies(self) -> list:
@@ -271,37 +781,31 @@ class WorldWarPlugin(BasePlugin):
 
     def get_plugin_components(self) -> List[Tuple[ComponentInfo, Type]]:
         """返回插件包含的所有组件"""
+        command_components = [
+            ("components.enable_join_command", self.JoinCommand),
+            ("components.enable_my_command", self.MyCommand),
+            ("components.enable_friends_command", self.FriendsCommand),
+            ("components.enable_pvp_command", self.PvpCommand),
+            ("components.enable_conquer_command", self.ConquerCommand),
+            ("components.enable_ally_command", self.AllyCommand),
+            ("components.enable_withdraw_command", self.WithdrawCommand),
+            ("components.enable_deploy_command", self.DeployCommand),
+            ("components.enable_transfer_command", self.TransferCommand),
+            ("components.enable_appoint_command", self.AppointCommand),
+            ("components.enable_set_ideology_command", self.SetIdeologyCommand),
+            ("components.enable_help_command", self.HelpCommand),
+            ("components.enable_nation_command", self.NationCommand),
+            ("components.enable_world_command", self.WorldCommand),
+        ]
+        enabled_commands = [command for key, command in command_components if self.get_config(key, True)]
+
         components = []
-        if self.get_config("components.enable_join_command", True):
-            components.append((self.JoinCommand.get_command_info(), self.JoinCommand))
-        if self.get_config("components.enable_my_command", True):
-            components.append((self.MyCommand.get_command_info(), self.MyCommand))
-        if self.get_config("components.enable_friends_command", True):
-            components.append((self.FriendsCommand.get_command_info(), self.FriendsCommand))
-        if self.get_config("components.enable_pvp_command", True):
-            components.append((self.PvpCommand.get_command_info(), self.PvpCommand))
-        if self.get_config("components.enable_conquer_command", True):
-            components.append((self.ConquerCommand.get_command_info(), self.ConquerCommand))
-        if self.get_config("components.enable_ally_command", True):
-            components.append((self.AllyCommand.get_command_info(), self.AllyCommand))
-        if self.get_config("components.enable_withdraw_command", True):
-            components.append((self.WithdrawCommand.get_command_info(), self.WithdrawCommand))
-        if self.get_config("components.enable_deploy_command", True):
-            components.append((self.DeployCommand.get_command_info(), self.DeployCommand))
-        if self.get_config("components.enable_transfer_command", True):
-            components.append((self.TransferCommand.get_command_info(), self.TransferCommand))
-        if self.get_config("components.enable_appoint_command", True):
-            components.append((self.AppointCommand.get_command_info(), self.AppointCommand))
-        if self.get_config("components.enable_set_ideology_command", True):
-            components.append((self.SetIdeologyCommand.get_command_info(), self.SetIdeologyCommand))
-        if self.get_config("components.enable_help_command", True):
-            components.append((self.HelpCommand.get_command_info(), self.HelpCommand))
-        if self.get_config("components.enable_nation_command", True):
-            components.append((self.NationCommand.get_command_info(), self.NationCommand))
-        # --- 注册 WorldCommand ---
-        if self.get_config("components.enable_world_command", True):
-            components.append((self.WorldCommand.get_command_info(), self.WorldCommand))
-        # --- 注册结束 ---
+        if self.get_config("components.enable_command_router", True) and enabled_commands:
+            # 所有命令合并为一个组件注册，框架只需匹配一次
+            self.CommandRouter.bind(enabled_commands)
+            components.append((self.CommandRouter.get_command_info(), self.CommandRouter))
+        else:
+            components.extend((command.get_command_info(), command) for command in enabled_commands)
 
         # Action 组件 (包括随机事件)
         if self.get_config("components.enable_random_event_action", True):
@@ -311,103 +815,222 @@ class WorldWarPlugin(BasePlugin):
 
     @staticmethod
     def _load_game_data(data_file_path: str) -> Dict[str, Any]:
-        """从JSON文件加载游戏数据"""
-        default_data = {"players": {}, "nations": {}, "alliances": set(), "last_event_time": 0}
+        """从JSON文件加载游戏数据，并在其上重放 <data_file_path>.log 中尚未合并的修改日志"""
+        data = {"players": {}, "nations": {}, "alliances": [], "last_event_time": 0}
         if os.path.exists(data_file_path):
             try:
-                with open(data_file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                data.setdefault("players", {})
-                data.setdefault("nations", {})
-                data.setdefault("last_event_time", 0)
-                raw_alliances = data.setdefault("alliances", [])
-                if isinstance(raw_alliances, list) and raw_alliances and isinstance(raw_alliances[0], list):
-                    data["alliances"] = set(frozenset(a) for a in raw_alliances)
-                elif isinstance(raw_alliances, list):
-                    data["alliances"] = set()
-                else:
-                    data["alliances"] = set()
-                return data
+                data = _json_load_file(data_file_path)
             except Exception as e:
                 # 假设可以从全局或某个地方获取 logger，这里简化处理
                 print(f"[WorldWarPlugin] 加载游戏数据失败: {e}") 
-                return default_data
+        WorldWarPlugin._replay_journal(data, data_file_path + ".log")
+
+        data.setdefault("players", {})
+        data.setdefault("nations", {})
+        data.setdefault("last_event_time", 0)
+        # 存档中的盟约是国家对的列表，内存中统一转为 国家 -> 盟友集合 的邻接表，查询与增删均为 O(1)
+        # 国家名在各处反复用作字典键并互相比较，统一驻留 (sys.intern) 后同名字符串共享同一对象，
+        # 比较时可直接按地址判等，哈希值也只计算一次
+        raw_alliances = data.get("alliances")
+        if isinstance(raw_alliances, list):
+            data["alliances"] = build_ally_index(
+                [sys.intern(n) for n in a] for a in raw_alliances if isinstance(a, list)
+            )
         else:
-            # 文件不存在，返回默认数据
-            return default_data
+            data["alliances"] = {}
+        data["nations"] = {sys.intern(name): nation for name, nation in data["nations"].items()}
+        for player in data["players"].values():
+            if isinstance(player.get("nation"), str):
+                player["nation"] = sys.intern(player["nation"])
+        # 成员以集合保存在内存中，加入/退出/成员判断均为 O(1)
+        for nation in data["nations"].values():
+            nation["members"] = set(nation.get("members", []))
+            for key, default in _NATION_NUMERIC_DEFAULTS:
+                nation.setdefault(key, default)
+        # 派生索引（以下划线开头，不写入存档）
+        data["_leaders"] = build_leader_index(data["players"], data["nations"])
+        return data
+
+    @staticmethod
+    def _replay_journal(data: Dict[str, Any], journal_path: str):
+        """将修改日志中的每条记录按顺序覆盖到快照数据上"""
+        if not os.path.exists(journal_path):
+            return
+        try:
+            with open(journal_path, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = _json_loads(line)
+                    except Exception:
+                        # 进程在写入途中被杀死时留下的残行，直接跳过
+                        continue
+                    data.setdefault("nations", {}).update(entry.get("nations", {}))
+                    data.setdefault("players", {}).update(entry.get("players", {}))
+                    if "alliances" in entry:
+                        data["alliances"] = entry["alliances"]
+                    if "last_event_time" in entry:
+                        data["last_event_time"] = entry["last_event_time"]
+        except Exception as e:
+            print(f"[WorldWarPlugin] 重放修改日志失败: {e}")
 
     @staticmethod
-    def _save_game_data(data_to_save: Dict[str, Any], data_file_path: str):
-        """将游戏数据保存到JSON文件"""
+    def _save_game_data(data_to_save: Dict[str, Any], data_file_path: str) -> bool:
+        """将游戏数据保存到JSON文件（先写临时文件再替换，避免写入中断损坏存档），成功返回 True"""
         if data_to_save is None:
              print("尝试保存游戏数据，但数据为空。")
-             return
+             return False
         try:
-            serializable_state = data_to_save.copy()
-            if "alliances" in serializable_state and isinstance(serializable_state["alliances"], set):
-                serializable_state["alliances"] = [list(a) for a in data_to_save["alliances"]]
-            with open(data_file_path, 'w', encoding='utf-8') as f:
-                json.dump(serializable_state, f, ensure_ascii=False, indent=4)
+            payload = WorldWarPlugin._encode_game_data(data_to_save)
         except Exception as e:
             print(f"保存游戏数据失败: {e}") # 简化处理
+            return False
+        return WorldWarPlugin._write_game_file(payload, data_file_path)
 
     @staticmethod
-    async def broadcast_to_public_static(message: str, target_chat_id: str, enable_announcements: bool):
-        """静态方法：广播消息到公屏"""
+    def _encode_game_data(data_to_save: Dict[str, Any]) -> bytes:
+        """将游戏数据序列化为存档字节串"""
+        # 以下划线开头的键是加载时重建的派生索引，无需保存
+        # 成员、盟约等集合由 _json_default 转为列表
+        serializable_state = {k: v for k, v in data_to_save.items() if not k.startswith("_")}
+        if "alliances" in serializable_state:
+            serializable_state["alliances"] = alliance_pairs(data_to_save["alliances"])
+        return _json_dumps(serializable_state)
+
+    @staticmethod
+    def _write_game_file(payload: bytes, data_file_path: str) -> bool:
+        """将序列化好的存档写入文件（先写临时文件再替换），只做文件操作，可在线程中执行，成功返回 True"""
+        # 每次写入使用不同的临时文件名，并发写入也不会截断彼此的临时文件
+        tmp_path = f"{data_file_path}.{os.getpid()}.{next(_TMP_COUNTER)}.tmp"
+        try:
+            # 绕过文件对象的缓冲层，整块字节串直接 os.write；替换前 fsync，断电时不会得到半截存档
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+            try:
+                view = memoryview(payload)
+                while view:
+                    view = view[os.write(fd, view):]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, data_file_path)
+            return True
+        except Exception as e:
+            print(f"保存游戏数据失败: {e}") # 简化处理
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return False
+
+    @staticmethod
+    async def broadcast_to_public_static(message: Union[str, Callable[[], str]], target_chat_id: str, enable_announcements: bool):
+        """
+        静态方法：广播消息到公屏（加入合并发送队列，不等待实际发送）。
+        message 可以是返回消息文本的函数，公告被禁用时不会调用，省去只用于公告的字符串拼接。
+        """
         if not enable_announcements:
             print("公屏公告已禁用，跳过广播。")
             return
 
-        try:
-            # 使用 send_api 发送消息到指定群聊
-            await send_api.send_to_chat_stream(target_chat_id, message)
-            print(f"已广播到公屏 ({target_chat_id}): {message}")
-        except Exception as e:
-             print(f"广播到公屏失败: {e}")
+        _Announcer.put(target_chat_id, message() if callable(message) else message)
+
+    @staticmethod
+    async def reply_and_broadcast(command: BaseCommand, message: str, cfg: types.SimpleNamespace):
+        """
+        静态方法：回复命令发起者并广播同一条消息到公屏。
+        命令本身就发在公屏群里时，回复已经出现在公屏上，不再重复广播。
+        """
+        await command.send_text(message)
+        group_info = getattr(command.message.message_info, "group_info", None)
+        if group_info is not None and str(getattr(group_info, "group_id", "")) == str(cfg.announce_chat):
+            return
+        await WorldWarPlugin.broadcast_to_public_static(message, cfg.announce_chat, cfg.announce_enabled)
 
     async def on_load(self):
         """插件加载时执行"""
         print("世界大战插件已加载。")
-        # 在插件加载时初始化 game_state
-        self.game_state = self._load_game_data(self.data_file)
+        # 在插件加载时初始化 game_state 并缓存配置
+        self.game_state = await _GameState.aget()
+        _Config.values = None
+        _Config.get(self)
 
     async def on_unload(self):
         """插件卸载时执行"""
         print("世界大战插件正在卸载，保存游戏数据...")
-        self._save_game_data(self.game_state, self.data_file)
+        await _Announcer.flush()
+        await _GameState.flush()
         print("世界大战插件已卸载。")
 
     # --- Command 组件 ---
 
+    class CommandRouter(BaseCommand):
+        """
+        命令分发组件。
+        框架会逐个尝试已注册命令的正则，本插件的命令合并为一个组件后只需尝试一次：
+        command_pattern 是所有已启用命令正则的并集（各自带 ^$ 锚定，匹配范围与逐个注册完全一致），
+        每个分支以命令词作为命名分组，匹配一次后由 lastgroup 直接得到命中的命令，交给对应的命令类执行。
+        """
+        command_name = "world_war_router_command"
+        command_description = "世界大战模拟器命令分发"
+        command_pattern = r"(?!)"  # 由 bind() 根据已启用的命令生成
+        _compiled_pattern = re.compile(command_pattern)
+        _dispatch: Dict[str, Type[BaseCommand]] = {}
+
+        @classmethod
+        def bind(cls, commands: List[Type[BaseCommand]]):
+            """根据已启用的命令类生成分发表与合并后的正则"""
+            cls._dispatch = {command.command_verb: command for command in commands}
+            cls.command_pattern = "|".join(
+                f"(?P<{command.command_verb}>{command.command_pattern})" for command in commands
+            )
+            cls._compiled_pattern = re.compile(cls.command_pattern)
+
+        async def execute(self) -> tuple[bool, str | None, bool]:
+            try:
+                raw_message = self.message.raw_message
+            except AttributeError as e:
+                error_msg = "无法获取消息内容。"
+                await self.send_text(error_msg)
+                return False, error_msg, True
+
+            # 外层命名分组最后闭合，lastgroup 即命中分支的命令词
+            match = self._compiled_pattern.match(raw_message)
+            command_class = self._dispatch.get(match.lastgroup) if match else None
+            if command_class is None:
+                return False, None, False
+            return await command_class(self.message, self.plugin_config).execute()
+
     class JoinCommand(BaseCommand):
         command_name = "join_command"
         command_description = "加入或创建一个国家"
+        command_verb = "join"
         command_pattern = r"^/join\s+(.+)$"
+        _compiled_pattern = re.compile(command_pattern)
 
         async def execute(self) -> tuple[bool, str | None, bool]:
             try:
                 user_id = self.message.message_info.user_info.user_id
                 raw_message = self.message.raw_message
             except AttributeError as e:
-                error_msg = "无法获取用户信息或消息内容。"
+                error_msg = _MSG_NO_USER_OR_MESSAGE
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            data_file_path = "./World/data/game_data.json"
             try:
-                game_data = WorldWarPlugin._load_game_data(data_file_path)
+                game_data = await _GameState.aget()
             except Exception as e:
                 error_msg = f"加载游戏数据失败: {e}"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            match = re.match(self.command_pattern, raw_message)
+            match = self._compiled_pattern.match(raw_message)
             if not match:
                 error_msg = "命令格式错误。请使用: /join <国家名>"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            nation_name = match.group(1).strip()
+            nation_name = sys.intern(match.group(1).strip())
 
             # --- 添加违禁词检查 ---
             if contains_banned_words(nation_name):
@@ -423,60 +1046,64 @@ class WorldWarPlugin(BasePlugin):
                 await self.send_text(msg)
                 return True, msg, True
 
+            changed_nations = [nation_name]
             if player_info and player_info.get("nation") != nation_name:
                 old_nation = player_info["nation"]
+                changed_nations.append(old_nation)
                 old_nation_info = get_nation_info(game_data, old_nation)
+                game_data["_leaders"].pop(user_id, None)
                 if old_nation_info:
-                    old_nation_info["members"] = [m for m in old_nation_info.get("members", []) if m != user_id]
+                    old_nation_info.setdefault("members", set()).discard(user_id)
                     if old_nation_info.get("leader") == user_id:
                         old_nation_info["leader"] = None
 
+            cfg = _Config.get(self)
             existing_nation = get_nation_info(game_data, nation_name)
             if not existing_nation:
-                # 直接通过 self.get_config 访问配置
                 new_nation = {
                     "name": nation_name,
-                    "troops": self.get_config("game.initial_troops", 1000),
-                    "territory": self.get_config("game.initial_territory", 15),
-                    "population": self.get_config("game.initial_population", 1000000),
+                    "troops": cfg.initial_troops,
+                    "territory": cfg.initial_territory,
+                    "population": cfg.initial_population,
                     "elo": 1500,
                     "leader": user_id,
-                    "members": [user_id],
+                    "members": {user_id},
                     "ideology": random.choice(IDEOLOGIES),
                     "deployed_troops": 0
                 }
                 game_data["nations"][nation_name] = new_nation
+                game_data["_leaders"][user_id] = nation_name
                 msg = f"🎉 恭喜！你创建了新的国家 {nation_name} 并成为领袖！\n制度: {new_nation['ideology']}\n{IDEOLOGY_EFFECTS.get(new_nation['ideology'], '')}"
-                # 调用静态广播方法
-                await WorldWarPlugin.broadcast_to_public_static(
-                    f"🌍 全球新闻: 玩家 {user_id} 创建了新国家 {nation_name}！",
-                    self.get_config("game.announcement_chat_id", "12345678"),
-                    self.get_config("game.enable_public_announcements", True)
-                )
+                news = "创建了新国家"
             else:
-                if existing_nation.get("leader") and user_id in existing_nation.get("members", []):
+                members = existing_nation.setdefault("members", set())
+                if existing_nation.get("leader") and user_id in members:
                      msg = f"你已经是 {nation_name} 的成员了。"
                      await self.send_text(msg)
                      return True, msg, True
-                existing_nation.setdefault("members", []).append(user_id)
+                members.add(user_id)
                 if not existing_nation.get("leader"):
                     existing_nation["leader"] = user_id
+                    game_data["_leaders"][user_id] = nation_name
                 msg = f"🎉 欢迎加入 {nation_name}！"
-                # 调用静态广播方法
-                await WorldWarPlugin.broadcast_to_public_static(
-                    f"🌍 全球新闻: 玩家 {user_id} 加入了国家 {nation_name}！",
-                    self.get_config("game.announcement_chat_id", "12345678"),
-                    self.get_config("game.enable_public_announcements", True)
-                )
+                news = "加入了国家"
 
+            # 先完成所有数据修改再等待广播，避免其他命令在此期间读到一半的状态
             game_data["players"][user_id] = {
                 "user_id": user_id,
                 "nation": nation_name,
                 "rank": "士兵"
             }
 
+            # 调用静态广播方法（公告文本只在启用公告时才拼接）
+            await WorldWarPlugin.broadcast_to_public_static(
+                lambda: f"🌍 全球新闻: 玩家 {user_id} {news} {nation_name}！",
+                cfg.announce_chat,
+                cfg.announce_enabled
+            )
+
             try:
-                WorldWarPlugin._save_game_data(game_data, data_file_path)
+                await _GameState.commit(nations=changed_nations, players=[user_id])
             except Exception as e:
                 error_msg = f"保存游戏数据失败: {e}"
                 await self.send_text(error_msg)
@@ -488,26 +1115,26 @@ class WorldWarPlugin(BasePlugin):
     class MyCommand(BaseCommand):
         command_name = "my_command"
         command_description = "查看自己的信息"
+        command_verb = "my"
         command_pattern = r"^/my$"
 
         async def execute(self) -> tuple[bool, str | None, bool]:
             try:
                 user_id = self.message.message_info.user_info.user_id
             except AttributeError as e:
-                error_msg = "无法获取用户信息。"
+                error_msg = _MSG_NO_USER_INFO
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            data_file_path = "./World/data/game_data.json"
             try:
-                game_data = WorldWarPlugin._load_game_data(data_file_path)
+                game_data = await _GameState.aget()
             except Exception as e:
                 error_msg = f"加载游戏数据失败: {e}"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
             player_info = get_player_info(game_data, user_id)
-            player_nation_name = get_player_nation(game_data, user_id)
+            player_nation_name = player_info.get("nation") if player_info else None
             nation_info = get_nation_info(game_data, player_nation_name) if player_nation_name else None
 
             info_str = format_player_info(user_id, player_info, nation_info)
@@ -517,19 +1144,19 @@ class WorldWarPlugin(BasePlugin):
     class FriendsCommand(BaseCommand):
         command_name = "friends_command"
         command_description = "查看当前的友军列表"
+        command_verb = "friends"
         command_pattern = r"^/friends$"
 
         async def execute(self) -> tuple[bool, str| None, bool]:
             try:
                 user_id = self.message.message_info.user_info.user_id
             except AttributeError as e:
-                error_msg = "无法获取用户信息。"
+                error_msg = _MSG_NO_USER_INFO
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            data_file_path = "./World/data/game_data.json"
             try:
-                game_data = WorldWarPlugin._load_game_data(data_file_path)
+                game_data = await _GameState.aget()
             except Exception as e:
                 error_msg = f"加载游戏数据失败: {e}"
                 await self.send_text(error_msg)
@@ -537,7 +1164,7 @@ class WorldWarPlugin(BasePlugin):
 
             player_nation_name = get_player_nation(game_data, user_id)
             if not player_nation_name:
-                msg = "你尚未加入任何国家。"
+                msg = _MSG_NOT_JOINED
                 await self.send_text(msg)
                 return True, msg, True
 
@@ -552,6 +1179,7 @@ class WorldWarPlugin(BasePlugin):
     class PvpCommand(BaseCommand):
         command_name = "pvp_command"
         command_description = "对指定国家发起战斗"
+        command_verb = "pvp"
         command_pattern = r"^/pvp\s+(.+?)\s+(\d+)$"
 
         async def execute(self) -> tuple[bool, str | None, bool]:
@@ -559,29 +1187,29 @@ class WorldWarPlugin(BasePlugin):
                 user_id = self.message.message_info.user_info.user_id
                 raw_message = self.message.raw_message
             except AttributeError as e:
-                error_msg = "无法获取用户信息或消息内容。"
+                error_msg = _MSG_NO_USER_OR_MESSAGE
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            data_file_path = "./World/data/game_data.json"
             try:
-                game_data = WorldWarPlugin._load_game_data(data_file_path)
+                game_data = await _GameState.aget()
             except Exception as e:
                 error_msg = f"加载游戏数据失败: {e}"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            match = re.match(self.command_pattern, raw_message)
-            if not match:
+            args = _split_command_args(raw_message, self.command_verb)
+            parsed_args = _split_name_and_amount(args) if args else None
+            if not parsed_args:
                 error_msg = "命令格式错误。请使用: /pvp <国家名> <出兵数量>"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            target_nation_name = match.group(1).strip()
+            target_nation_name, amount_str = parsed_args
             try:
-                attack_troops = int(match.group(2))
+                attack_troops = int(amount_str)
             except ValueError:
-                error_msg = "出兵数量必须是一个整数。"
+                error_msg = _MSG_TROOPS_NOT_INT
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
@@ -610,7 +1238,7 @@ class WorldWarPlugin(BasePlugin):
                 return True, msg, True
 
             if attack_troops <= 0:
-                msg = "出兵数量必须大于0。"
+                msg = _MSG_TROOPS_NOT_POSITIVE
                 await self.send_text(msg)
                 return True, msg, True
 
@@ -619,84 +1247,40 @@ class WorldWarPlugin(BasePlugin):
                 await self.send_text(msg)
                 return True, msg, True
 
-            effective_defense_troops = max(1, target_nation_info["troops"] - target_nation_info.get("deployed_troops", 0))
-            attack_power = attack_troops * random.uniform(0.8, 1.2)
-            defense_power = effective_defense_troops * random.uniform(0.8, 1.2)
-
-            if attack_power > defense_power:
-                damage_dealt = min(int(attack_troops * 0.3), target_nation_info["troops"])
-                damage_taken = min(int(effective_defense_troops * 0.2), attack_troops)
-
-                attacker_nation_info["troops"] -= damage_taken
-                target_nation_info["troops"] -= damage_dealt
-
-                # 直接通过 self.get_config 访问配置
-                attacker_elo_change, target_elo_change = calculate_elo_change(
-                    attacker_nation_info.get("elo", 1500),
-                    target_nation_info.get("elo", 1500),
-                    1.0,
-                    self.get_config("game.elo_k_factor", 32.0)
-                )
-                attacker_nation_info["elo"] = max(100, attacker_nation_info.get("elo", 1500) + attacker_elo_change)
-                target_nation_info["elo"] = max(100, target_nation_info.get("elo", 1500) + target_elo_change)
-
-                result_msg = (
-                    f"⚔️ 战斗结果！\n"
-                    f"国家 {attacker_nation_name} 攻击 {target_nation_name} 获胜！\n"
-                    f"{attacker_nation_name} 损失 {damage_taken} 兵力，剩余 {attacker_nation_info['troops']}。\n"
-                    f"{target_nation_name} 损失 {damage_dealt} 兵力，剩余 {target_nation_info['troops']}。"
-                )
-                await self.send_text(result_msg)
-                # 调用静态广播方法
-                await WorldWarPlugin.broadcast_to_public_static(
-                    result_msg,
-                    self.get_config("game.announcement_chat_id", "12345678"),
-                    self.get_config("game.enable_public_announcements", True)
-                )
+            cfg = _Config.get(self)
+            target_troops = target_nation_info["troops"]
+            effective_defense_troops = max(1, target_troops - target_nation_info["deployed_troops"])
+            attacker_wins, attacker_loss, defender_loss = resolve_engagement(
+                attack_troops, effective_defense_troops, target_troops, 0.3, 0.2
+            )
 
-            else:
-                damage_dealt = min(int(effective_defense_troops * 0.3), attack_troops)
-                damage_taken = min(int(attack_troops * 0.2), effective_defense_troops)
-
-                attacker_nation_info["troops"] -= damage_dealt
-                target_nation_info["troops"] -= damage_taken
-
-                # 直接通过 self.get_config 访问配置
-                attacker_elo_change, target_elo_change = calculate_elo_change(
-                    attacker_nation_info.get("elo", 1500),
-                    target_nation_info.get("elo", 1500),
-                    0.0,
-                    self.get_config("game.elo_k_factor", 32.0)
-                )
-                attacker_nation_info["elo"] = max(100, attacker_nation_info.get("elo", 1500) + attacker_elo_change)
-                target_nation_info["elo"] = max(100, target_nation_info.get("elo", 1500) + target_elo_change)
+            attacker_nation_info["troops"] -= attacker_loss
+            target_nation_info["troops"] = target_troops - defender_loss
 
-                result_msg = (
-                    f"⚔️ 战斗结果！\n"
-                    f"国家 {attacker_nation_name} 攻击 {target_nation_name} 失败！\n"
-                    f"{attacker_nation_name} 损失 {damage_dealt} 兵力，剩余 {attacker_nation_info['troops']}。\n"
-                    f"{target_nation_name} 损失 {damage_taken} 兵力，剩余 {target_nation_info['troops']}。"
-                )
-                await self.send_text(result_msg)
-                # 调用静态广播方法
-                await WorldWarPlugin.broadcast_to_public_static(
-                    result_msg,
-                    self.get_config("game.announcement_chat_id", "12345678"),
-                    self.get_config("game.enable_public_announcements", True)
-                )
+            apply_elo_result(attacker_nation_info, target_nation_info, 1.0 if attacker_wins else 0.0, cfg.elo_k)
 
+            result_msg = (
+                f"⚔️ 战斗结果！\n"
+                f"国家 {attacker_nation_name} 攻击 {target_nation_name} {'获胜' if attacker_wins else '失败'}！\n"
+                f"{attacker_nation_name} 损失 {attacker_loss} 兵力，剩余 {attacker_nation_info['troops']}。\n"
+                f"{target_nation_name} 损失 {defender_loss} 兵力，剩余 {target_nation_info['troops']}。"
+            )
             try:
-                WorldWarPlugin._save_game_data(game_data, data_file_path)
+                await _GameState.commit(nations=[attacker_nation_name, target_nation_name])
             except Exception as e:
                 error_msg = f"保存游戏数据失败: {e}"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
+            # 数据落盘后再回复并广播到公屏
+            await WorldWarPlugin.reply_and_broadcast(self, result_msg, cfg)
+
             return True, None, True
 
     class ConquerCommand(BaseCommand):
         command_name = "conquer_command"
         command_description = "对指定国家发起掠夺领土"
+        command_verb = "conquer"
         command_pattern = r"^/conquer\s+(.+?)\s+(\d+)$"
 
         async def execute(self) -> tuple[bool, str | None, bool]:
@@ -704,29 +1288,29 @@ class WorldWarPlugin(BasePlugin):
                 user_id = self.message.message_info.user_info.user_id
                 raw_message = self.message.raw_message
             except AttributeError as e:
-                error_msg = "无法获取用户信息或消息内容。"
+                error_msg = _MSG_NO_USER_OR_MESSAGE
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            data_file_path = "./World/data/game_data.json"
             try:
-                game_data = WorldWarPlugin._load_game_data(data_file_path)
+                game_data = await _GameState.aget()
             except Exception as e:
                 error_msg = f"加载游戏数据失败: {e}"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            match = re.match(self.command_pattern, raw_message)
-            if not match:
+            args = _split_command_args(raw_message, self.command_verb)
+            parsed_args = _split_name_and_amount(args) if args else None
+            if not parsed_args:
                 error_msg = "命令格式错误。请使用: /conquer <国家名> <出兵数量>"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            target_nation_name = match.group(1).strip()
+            target_nation_name, amount_str = parsed_args
             try:
-                attack_troops = int(match.group(2))
+                attack_troops = int(amount_str)
             except ValueError:
-                error_msg = "出兵数量必须是一个整数。"
+                error_msg = _MSG_TROOPS_NOT_INT
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
@@ -755,7 +1339,7 @@ class WorldWarPlugin(BasePlugin):
                 return True, msg, True
 
             if attack_troops <= 0:
-                msg = "出兵数量必须大于0。"
+                msg = _MSG_TROOPS_NOT_POSITIVE
                 await self.send_text(msg)
                 return True, msg, True
 
@@ -764,110 +1348,77 @@ class WorldWarPlugin(BasePlugin):
                 await self.send_text(msg)
                 return True, msg, True
 
-            effective_defense_troops = max(1, target_nation_info["troops"] - target_nation_info.get("deployed_troops", 0))
-            attack_power = attack_troops * random.uniform(0.8, 1.2)
-            defense_power = effective_defense_troops * random.uniform(0.8, 1.2)
-
-            if attack_power > defense_power:
-                damage_dealt = min(int(attack_troops * 0.2), target_nation_info["troops"])
-                damage_taken = min(int(effective_defense_troops * 0.15), attack_troops)
-                territory_gained = max(1, int(target_nation_info.get("territory", 15) * 0.05))
-
-                attacker_nation_info["troops"] -= damage_taken
-                target_nation_info["troops"] -= damage_dealt
-                attacker_nation_info["territory"] = attacker_nation_info.get("territory", 15) + territory_gained
-                target_nation_info["territory"] = max(1, target_nation_info.get("territory", 15) - territory_gained)
-
-                # 直接通过 self.get_config 访问配置
-                attacker_elo_change, target_elo_change = calculate_elo_change(
-                    attacker_nation_info.get("elo", 1500),
-                    target_nation_info.get("elo", 1500),
-                    1.0,
-                    self.get_config("game.elo_k_factor", 32.0)
-                )
-                attacker_nation_info["elo"] = max(100, attacker_nation_info.get("elo", 1500) + attacker_elo_change)
-                target_nation_info["elo"] = max(100, target_nation_info.get("elo", 1500) + target_elo_change)
+            cfg = _Config.get(self)
+            target_troops = target_nation_info["troops"]
+            attacker_territory = attacker_nation_info["territory"]
+            target_territory = target_nation_info["territory"]
+            effective_defense_troops = max(1, target_troops - target_nation_info["deployed_troops"])
+            attacker_wins, attacker_loss, defender_loss = resolve_engagement(
+                attack_troops, effective_defense_troops, target_troops, 0.2, 0.15
+            )
+
+            attacker_nation_info["troops"] -= attacker_loss
+            target_nation_info["troops"] = target_troops - defender_loss
+            apply_elo_result(attacker_nation_info, target_nation_info, 1.0 if attacker_wins else 0.0, cfg.elo_k)
+
+            if attacker_wins:
+                territory_gained = max(1, int(target_territory * 0.05))
+                attacker_nation_info["territory"] = attacker_territory + territory_gained
+                target_nation_info["territory"] = max(1, target_territory - territory_gained)
 
                 result_msg = (
                     f"🏴 掠夺结果！\n"
                     f"国家 {attacker_nation_name} 成功掠夺了 {target_nation_name} 的 {territory_gained} 单位领土！\n"
-                    f"{attacker_nation_name} 损失 {damage_taken} 兵力，剩余 {attacker_nation_info['troops']}。\n"
-                    f"{target_nation_name} 损失 {damage_dealt} 兵力，剩余 {target_nation_info['troops']}。"
+                    f"{attacker_nation_name} 损失 {attacker_loss} 兵力，剩余 {attacker_nation_info['troops']}。\n"
+                    f"{target_nation_name} 损失 {defender_loss} 兵力，剩余 {target_nation_info['troops']}。"
                 )
-                await self.send_text(result_msg)
-                # 调用静态广播方法
-                await WorldWarPlugin.broadcast_to_public_static(
-                    result_msg,
-                    self.get_config("game.announcement_chat_id", "12345678"),
-                    self.get_config("game.enable_public_announcements", True)
-                )
-
             else:
-                damage_dealt = min(int(effective_defense_troops * 0.2), attack_troops)
-                damage_taken = min(int(attack_troops * 0.15), effective_defense_troops)
-                territory_lost = max(1, int(attacker_nation_info.get("territory", 15) * 0.03))
-
-                attacker_nation_info["troops"] -= damage_dealt
-                target_nation_info["troops"] -= damage_taken
-                attacker_nation_info["territory"] = max(1, attacker_nation_info.get("territory", 15) - territory_lost)
-                target_nation_info["territory"] = target_nation_info.get("territory", 15) + territory_lost
-
-                # 直接通过 self.get_config 访问配置
-                attacker_elo_change, target_elo_change = calculate_elo_change(
-                    attacker_nation_info.get("elo", 1500),
-                    target_nation_info.get("elo", 1500),
-                    0.0,
-                    self.get_config("game.elo_k_factor", 32.0)
-                )
-                attacker_nation_info["elo"] = max(100, attacker_nation_info.get("elo", 1500) + attacker_elo_change)
-                target_nation_info["elo"] = max(100, target_nation_info.get("elo", 1500) + target_elo_change)
+                territory_lost = max(1, int(attacker_territory * 0.03))
+                attacker_nation_info["territory"] = max(1, attacker_territory - territory_lost)
+                target_nation_info["territory"] = target_territory + territory_lost
 
                 result_msg = (
                     f"🏴 掠夺结果！\n"
                     f"国家 {attacker_nation_name} 掠夺 {target_nation_name} 失败！\n"
-                    f"{attacker_nation_name} 损失 {damage_dealt} 兵力和 {territory_lost} 单位领土，剩余兵力 {attacker_nation_info['troops']}，剩余领土 {attacker_nation_info['territory']}。\n"
-                    f"{target_nation_name} 损失 {damage_taken} 兵力。"
+                    f"{attacker_nation_name} 损失 {attacker_loss} 兵力和 {territory_lost} 单位领土，剩余兵力 {attacker_nation_info['troops']}，剩余领土 {attacker_nation_info['territory']}。\n"
+                    f"{target_nation_name} 损失 {defender_loss} 兵力。"
                 )
-                await self.send_text(result_msg)
-                # 调用静态广播方法
-                await WorldWarPlugin.broadcast_to_public_static(
-                    result_msg,
-                    self.get_config("game.announcement_chat_id", "12345678"),
-                    self.get_config("game.enable_public_announcements", True)
-                )
-
             try:
-                WorldWarPlugin._save_game_data(game_data, data_file_path)
+                await _GameState.commit(nations=[attacker_nation_name, target_nation_name])
             except Exception as e:
                 error_msg = f"保存游戏数据失败: {e}"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
+            # 数据落盘后再回复并广播到公屏
+            await WorldWarPlugin.reply_and_broadcast(self, result_msg, cfg)
+
             return True, None, True
 
     class AllyCommand(BaseCommand):
         command_name = "ally_command"
         command_description = "与指定国家结盟"
+        command_verb = "ally"
         command_pattern = r"^/ally\s+(.+)$"
+        _compiled_pattern = re.compile(command_pattern)
 
         async def execute(self) -> tuple[bool, str | None, bool]:
             try:
                 user_id = self.message.message_info.user_info.user_id
                 raw_message = self.message.raw_message
             except AttributeError as e:
-                error_msg = "无法获取用户信息或消息内容。"
+                error_msg = _MSG_NO_USER_OR_MESSAGE
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            data_file_path = "./World/data/game_data.json"
             try:
-                game_data = WorldWarPlugin._load_game_data(data_file_path)
+                game_data = await _GameState.aget()
             except Exception as e:
                 error_msg = f"加载游戏数据失败: {e}"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            match = re.match(self.command_pattern, raw_message)
+            match = self._compiled_pattern.match(raw_message)
             if not match:
                 error_msg = "命令格式错误。请使用: /ally <国家名>"
                 await self.send_text(error_msg)
@@ -886,7 +1437,6 @@ class WorldWarPlugin(BasePlugin):
                 await self.send_text(msg)
                 return True, msg, True
 
-            player_nation_info = get_nation_info(game_data, player_nation_name)
             ally_nation_info = get_nation_info(game_data, ally_nation_name)
 
             if not ally_nation_info:
@@ -899,7 +1449,7 @@ class WorldWarPlugin(BasePlugin):
                 await self.send_text(msg)
                 return True, msg, True
 
-            if not player_nation_info.get("leader") or player_nation_info["leader"] != user_id:
+            if not is_nation_leader(game_data, user_id, player_nation_name):
                 msg = "只有国家领袖才能发起结盟。"
                 await self.send_text(msg)
                 return True, msg, True
@@ -909,54 +1459,46 @@ class WorldWarPlugin(BasePlugin):
                 await self.send_text(msg)
                 return True, msg, True
 
-            alliances = game_data.setdefault("alliances", set())
-            if not isinstance(alliances, set):
-                alliances = set(frozenset(a) for a in alliances) if isinstance(alliances, list) else set()
-                game_data["alliances"] = alliances
-
-            new_alliance = frozenset([player_nation_name, ally_nation_name])
-            alliances.add(new_alliance)
+            add_alliance(game_data, player_nation_name, ally_nation_name)
 
             msg = f"🤝 国家 {player_nation_name} 与 {ally_nation_name} 成功结盟！"
-            await self.send_text(msg)
-            # 调用静态广播方法
-            await WorldWarPlugin.broadcast_to_public_static(
-                msg,
-                self.get_config("game.announcement_chat_id", "12345678"),
-                self.get_config("game.enable_public_announcements", True)
-            )
+            cfg = _Config.get(self)
             try:
-                WorldWarPlugin._save_game_data(game_data, data_file_path)
+                await _GameState.commit(alliances=True)
             except Exception as e:
                 error_msg = f"保存游戏数据失败: {e}"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
+            # 数据落盘后再回复并广播到公屏
+            await WorldWarPlugin.reply_and_broadcast(self, msg, cfg)
+
             return True, msg, True
 
     class WithdrawCommand(BaseCommand):
         command_name = "withdraw_command"
         command_description = "解除与指定国家的盟友关系"
+        command_verb = "withdraw"
         command_pattern = r"^/withdraw\s+(.+)$"
+        _compiled_pattern = re.compile(command_pattern)
 
         async def execute(self) -> tuple[bool, str | None, bool]:
             try:
                 user_id = self.message.message_info.user_info.user_id
                 raw_message = self.message.raw_message
             except AttributeError as e:
-                error_msg = "无法获取用户信息或消息内容。"
+                error_msg = _MSG_NO_USER_OR_MESSAGE
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            data_file_path = "./World/data/game_data.json"
             try:
-                game_data = WorldWarPlugin._load_game_data(data_file_path)
+                game_data = await _GameState.aget()
             except Exception as e:
                 error_msg = f"加载游戏数据失败: {e}"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            match = re.match(self.command_pattern, raw_message)
+            match = self._compiled_pattern.match(raw_message)
             if not match:
                 error_msg = "命令格式错误。请使用: /withdraw <国家名>"
                 await self.send_text(error_msg)
@@ -975,7 +1517,6 @@ class WorldWarPlugin(BasePlugin):
                 await self.send_text(msg)
                 return True, msg, True
 
-            player_nation_info = get_nation_info(game_data, player_nation_name)
             ally_nation_info = get_nation_info(game_data, ally_nation_name)
 
             if not ally_nation_info:
@@ -988,48 +1529,29 @@ class WorldWarPlugin(BasePlugin):
                 await self.send_text(msg)
                 return True, msg, True
 
-            if not player_nation_info.get("leader") or player_nation_info["leader"] != user_id:
+            if not is_nation_leader(game_data, user_id, player_nation_name):
                 msg = "只有国家领袖才能解除盟约。"
                 await self.send_text(msg)
                 return True, msg, True
 
-            alliances = game_data.get("alliances", set())
-            if not isinstance(alliances, set):
-                alliances = set(frozenset(a) for a in alliances) if isinstance(alliances, list) else set()
-                game_data["alliances"] = alliances
-
-            alliance_to_remove = None
-            for alliance in alliances:
-                if isinstance(alliance, (list, tuple, set, frozenset)):
-                    if player_nation_name in alliance and ally_nation_name in alliance:
-                        alliance_to_remove = alliance
-                        break
-
-            if alliance_to_remove:
-                alliances.remove(alliance_to_remove)
-                msg = f"💔 国家 {player_nation_name} 与 {ally_nation_name} 的盟约已解除。"
-                await self.send_text(msg)
-                # 调用静态广播方法
-                await WorldWarPlugin.broadcast_to_public_static(
-                    msg,
-                    self.get_config("game.announcement_chat_id", "12345678"),
-                    self.get_config("game.enable_public_announcements", True)
-                )
-                try:
-                    WorldWarPlugin._save_game_data(game_data, data_file_path)
-                except Exception as e:
-                    error_msg = f"保存游戏数据失败: {e}"
-                    await self.send_text(error_msg)
-                    return False, error_msg, True
-                return True, msg, True
-            else:
-                msg = f"未找到 {player_nation_name} 与 {ally_nation_name} 的盟约记录。"
-                await self.send_text(msg)
-                return True, msg, True
+            remove_alliance(game_data, player_nation_name, ally_nation_name)
+            msg = f"💔 国家 {player_nation_name} 与 {ally_nation_name} 的盟约已解除。"
+            cfg = _Config.get(self)
+            try:
+                await _GameState.commit(alliances=True)
+            except Exception as e:
+                error_msg = f"保存游戏数据失败: {e}"
+                await self.send_text(error_msg)
+                return False, error_msg, True
+
+            # 数据落盘后再回复并广播到公屏
+            await WorldWarPlugin.reply_and_broadcast(self, msg, cfg)
+            return True, msg, True
 
     class DeployCommand(BaseCommand):
         command_name = "deploy_command"
         command_description = "在自己的领土上驻军"
+        command_verb = "deploy"
         command_pattern = r"^/deploy\s+(-?\d+)$"
 
         async def execute(self) -> tuple[bool, str | None, bool]:
@@ -1037,26 +1559,26 @@ class WorldWarPlugin(BasePlugin):
                 user_id = self.message.message_info.user_info.user_id
                 raw_message = self.message.raw_message
             except AttributeError as e:
-                error_msg = "无法获取用户信息或消息内容。"
+                error_msg = _MSG_NO_USER_OR_MESSAGE
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            data_file_path = "./World/data/game_data.json"
             try:
-                game_data = WorldWarPlugin._load_game_data(data_file_path)
+                game_data = await _GameState.aget()
             except Exception as e:
                 error_msg = f"加载游戏数据失败: {e}"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            match = re.match(self.command_pattern, raw_message)
-            if not match:
+            args = _split_command_args(raw_message, self.command_verb)
+            digits = args[1:] if args and args.startswith("-") else args
+            if not digits or not digits.isdecimal():
                 error_msg = "命令格式错误。请使用: /deploy <数量> (正数部署，负数撤回)"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
             try:
-                troops_to_deploy = int(match.group(1))
+                troops_to_deploy = int(args)
             except ValueError:
                 error_msg = "部署数量必须是一个整数。"
                 await self.send_text(error_msg)
@@ -1070,7 +1592,7 @@ class WorldWarPlugin(BasePlugin):
 
             player_nation_info = get_nation_info(game_data, player_nation_name)
 
-            current_deployed = player_nation_info.get("deployed_troops", 0)
+            current_deployed = player_nation_info["deployed_troops"]
             new_deployed = current_deployed + troops_to_deploy
 
             if new_deployed < 0:
@@ -1087,12 +1609,14 @@ class WorldWarPlugin(BasePlugin):
             action_word = "部署" if troops_to_deploy >= 0 else "撤回"
             msg = f"✅ 成功{action_word} {abs(troops_to_deploy)} 兵力。国家 {player_nation_name} 当前部署兵力: {new_deployed}。"
 
-            try:
-                WorldWarPlugin._save_game_data(game_data, data_file_path)
-            except Exception as e:
-                error_msg = f"保存游戏数据失败: {e}"
-                await self.send_text(error_msg)
-                return False, error_msg, True
+            # 部署数量为 0 时数据没有变化，无需记录
+            if troops_to_deploy != 0:
+                try:
+                    await _GameState.commit(nations=[player_nation_name])
+                except Exception as e:
+                    error_msg = f"保存游戏数据失败: {e}"
+                    await self.send_text(error_msg)
+                    return False, error_msg, True
 
             await self.send_text(msg)
             return True, msg, True
@@ -1100,6 +1624,7 @@ class WorldWarPlugin(BasePlugin):
     class TransferCommand(BaseCommand):
         command_name = "transfer_command"
         command_description = "(领袖) 将国家兵力转移给同国玩家"
+        command_verb = "transfer"
         command_pattern = r"^/transfer\s+(.+?)\s+(\d+)$"
 
         async def execute(self) -> tuple[bool, str | None, bool]:
@@ -1107,27 +1632,27 @@ class WorldWarPlugin(BasePlugin):
                 user_id = self.message.message_info.user_info.user_id
                 raw_message = self.message.raw_message
             except AttributeError as e:
-                error_msg = "无法获取用户信息或消息内容。"
+                error_msg = _MSG_NO_USER_OR_MESSAGE
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            data_file_path = "./World/data/game_data.json"
             try:
-                game_data = WorldWarPlugin._load_game_data(data_file_path)
+                game_data = await _GameState.aget()
             except Exception as e:
                 error_msg = f"加载游戏数据失败: {e}"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            match = re.match(self.command_pattern, raw_message)
-            if not match:
+            args = _split_command_args(raw_message, self.command_verb)
+            parsed_args = _split_name_and_amount(args) if args else None
+            if not parsed_args:
                 error_msg = "命令格式错误。请使用: /transfer <用户ID> <兵力数量>"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            target_user_id = match.group(1).strip()
+            target_user_id, amount_str = parsed_args
             try:
-                transfer_amount = int(match.group(2))
+                transfer_amount = int(amount_str)
             except ValueError:
                 error_msg = "兵力数量必须是一个整数。"
                 await self.send_text(error_msg)
@@ -1135,16 +1660,17 @@ class WorldWarPlugin(BasePlugin):
 
             player_nation_name = get_player_nation(game_data, user_id)
             if not player_nation_name:
-                msg = "你尚未加入任何国家。"
+                msg = _MSG_NOT_JOINED
                 await self.send_text(msg)
                 return True, msg, True
 
-            player_nation_info = get_nation_info(game_data, player_nation_name)
-            if not player_nation_info.get("leader") or player_nation_info["leader"] != user_id:
+            if not is_nation_leader(game_data, user_id, player_nation_name):
                 msg = "只有国家领袖才能转移兵力。"
                 await self.send_text(msg)
                 return True, msg, True
 
+            player_nation_info = get_nation_info(game_data, player_nation_name)
+
             target_player_info = get_player_info(game_data, target_user_id)
             if not target_player_info or target_player_info.get("nation") != player_nation_name:
                 msg = f"用户 {target_user_id} 不是你国家的成员。"
@@ -1168,7 +1694,7 @@ class WorldWarPlugin(BasePlugin):
 
             msg = f"✅ 成功将 {transfer_amount} 兵力从国家 {player_nation_name} 转移给玩家 {target_user_id}。"
             try:
-                WorldWarPlugin._save_game_data(game_data, data_file_path)
+                await _GameState.commit(nations=[player_nation_name, target_player_info["nation"]])
             except Exception as e:
                 error_msg = f"保存游戏数据失败: {e}"
                 await self.send_text(error_msg)
@@ -1180,6 +1706,7 @@ class WorldWarPlugin(BasePlugin):
     class AppointCommand(BaseCommand):
         command_name = "appoint_command"
         command_description = "(领袖) 任命官职"
+        command_verb = "appoint"
         command_pattern = r"^/appoint\s+(.+?)\s+(.+)$"
 
         async def execute(self) -> tuple[bool, str | None, bool]:
@@ -1187,48 +1714,44 @@ class WorldWarPlugin(BasePlugin):
                 user_id = self.message.message_info.user_info.user_id
                 raw_message = self.message.raw_message
             except AttributeError as e:
-                error_msg = "无法获取用户信息或消息内容。"
+                error_msg = _MSG_NO_USER_OR_MESSAGE
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            data_file_path = "./World/data/game_data.json"
             try:
-                game_data = WorldWarPlugin._load_game_data(data_file_path)
+                game_data = await _GameState.aget()
             except Exception as e:
                 error_msg = f"加载游戏数据失败: {e}"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            match = re.match(self.command_pattern, raw_message)
-            if not match:
+            parts = raw_message.split(None, 2)
+            if len(parts) != 3 or parts[0] != "/" + self.command_verb:
                 error_msg = "命令格式错误。请使用: /appoint <用户ID> <军衔>"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            target_user_id = match.group(1).strip()
-            new_rank = match.group(2).strip()
-
-            # --- 添加违禁词检查 (对军衔名称) ---
-            if contains_banned_words(new_rank):
-                msg = "❌ 军衔名称包含不适当的内容，请重新输入。"
-                await self.send_text(msg)
-                return True, msg, True # 成功处理请求，但拦截消息
-            # --- 违禁词检查结束 ---
+            target_user_id, new_rank = parts[1], parts[2].strip()
 
             if new_rank not in RANK_NAMES:
-                available_ranks = ", ".join(RANK_NAMES)
-                msg = f"无效的军衔 '{new_rank}'。可用军衔: {available_ranks}"
+                # --- 添加违禁词检查 (对军衔名称) ---
+                # 合法军衔均不含违禁词，只有不在白名单中的输入才需要扫描
+                if contains_banned_words(new_rank):
+                    msg = "❌ 军衔名称包含不适当的内容，请重新输入。"
+                    await self.send_text(msg)
+                    return True, msg, True # 成功处理请求，但拦截消息
+                # --- 违禁词检查结束 ---
+                msg = f"无效的军衔 '{new_rank}'。可用军衔: {_RANK_NAMES_JOINED}"
                 await self.send_text(msg)
                 return True, msg, True
 
             player_nation_name = get_player_nation(game_data, user_id)
             if not player_nation_name:
-                msg = "你尚未加入任何国家。"
+                msg = _MSG_NOT_JOINED
                 await self.send_text(msg)
                 return True, msg, True
 
-            player_nation_info = get_nation_info(game_data, player_nation_name)
-            if not player_nation_info.get("leader") or player_nation_info["leader"] != user_id:
+            if not is_nation_leader(game_data, user_id, player_nation_name):
                 msg = "只有国家领袖才能任命官职。"
                 await self.send_text(msg)
                 return True, msg, True
@@ -1243,12 +1766,14 @@ class WorldWarPlugin(BasePlugin):
             target_player_info["rank"] = new_rank
             msg = f"🎖️ 成功将玩家 {target_user_id} 的军衔从 '{old_rank}' 任命为 '{new_rank}'。"
 
-            try:
-                WorldWarPlugin._save_game_data(game_data, data_file_path)
-            except Exception as e:
-                error_msg = f"保存游戏数据失败: {e}"
-                await self.send_text(error_msg)
-                return False, error_msg, True
+            # 军衔未变化时无需记录
+            if new_rank != old_rank:
+                try:
+                    await _GameState.commit(players=[target_user_id])
+                except Exception as e:
+                    error_msg = f"保存游戏数据失败: {e}"
+                    await self.send_text(error_msg)
+                    return False, error_msg, True
 
             await self.send_text(msg)
             return True, msg, True
@@ -1256,26 +1781,27 @@ class WorldWarPlugin(BasePlugin):
     class SetIdeologyCommand(BaseCommand):
         command_name = "set_ideology_command"
         command_description = "(领袖) 设置国家制度"
+        command_verb = "set_ideology"
         command_pattern = r"^/set_ideology\s+(.+)$"
+        _compiled_pattern = re.compile(command_pattern)
 
         async def execute(self) -> tuple[bool, str | None, bool]:
             try:
                 user_id = self.message.message_info.user_info.user_id
                 raw_message = self.message.raw_message
             except AttributeError as e:
-                error_msg = "无法获取用户信息或消息内容。"
+                error_msg = _MSG_NO_USER_OR_MESSAGE
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            data_file_path = "./World/data/game_data.json"
             try:
-                game_data = WorldWarPlugin._load_game_data(data_file_path)
+                game_data = await _GameState.aget()
             except Exception as e:
                 error_msg = f"加载游戏数据失败: {e}"
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            match = re.match(self.command_pattern, raw_message)
+            match = self._compiled_pattern.match(raw_message)
             if not match:
                 error_msg = "命令格式错误。请使用: /set_ideology <制度>"
                 await self.send_text(error_msg)
@@ -1283,31 +1809,31 @@ class WorldWarPlugin(BasePlugin):
 
             new_ideology = match.group(1).strip()
 
-            # --- 添加违禁词检查 (对制度名称) ---
-            if contains_banned_words(new_ideology):
-                msg = "❌ 国家制度名称包含不适当的内容，请重新输入。"
-                await self.send_text(msg)
-                return True, msg, True # 成功处理请求，但拦截消息
-            # --- 违禁词检查结束 ---
-
-            if new_ideology not in IDEOLOGIES:
-                available_ideologies = ", ".join(IDEOLOGIES)
-                msg = f"无效的制度 '{new_ideology}'。可用制度: {available_ideologies}"
+            if new_ideology not in IDEOLOGY_NAMES:
+                # --- 添加违禁词检查 (对制度名称) ---
+                # 合法制度均不含违禁词，只有不在白名单中的输入才需要扫描
+                if contains_banned_words(new_ideology):
+                    msg = "❌ 国家制度名称包含不适当的内容，请重新输入。"
+                    await self.send_text(msg)
+                    return True, msg, True # 成功处理请求，但拦截消息
+                # --- 违禁词检查结束 ---
+                msg = f"无效的制度 '{new_ideology}'。可用制度: {_IDEOLOGIES_JOINED}"
                 await self.send_text(msg)
                 return True, msg, True
 
             player_nation_name = get_player_nation(game_data, user_id)
             if not player_nation_name:
-                msg = "你尚未加入任何国家。"
+                msg = _MSG_NOT_JOINED
                 await self.send_text(msg)
                 return True, msg, True
 
-            player_nation_info = get_nation_info(game_data, player_nation_name)
-            if not player_nation_info.get("leader") or player_nation_info["leader"] != user_id:
+            if not is_nation_leader(game_data, user_id, player_nation_name):
                 msg = "只有国家领袖才能设置国家制度。"
                 await self.send_text(msg)
                 return True, msg, True
 
+            player_nation_info = get_nation_info(game_data, player_nation_name)
+
             old_ideology = player_nation_info.get("ideology", "无")
             player_nation_info["ideology"] = new_ideology
             msg = (
@@ -1315,12 +1841,14 @@ class WorldWarPlugin(BasePlugin):
                 f"{IDEOLOGY_EFFECTS.get(new_ideology, '制度效果未知。')}"
             )
 
-            try:
-                WorldWarPlugin._save_game_data(game_data, data_file_path)
-            except Exception as e:
-                error_msg = f"保存游戏数据失败: {e}"
-                await self.send_text(error_msg)
-                return False, error_msg, True
+            # 制度未变化时无需记录
+            if new_ideology != old_ideology:
+                try:
+                    await _GameState.commit(nations=[player_nation_name])
+                except Exception as e:
+                    error_msg = f"保存游戏数据失败: {e}"
+                    await self.send_text(error_msg)
+                    return False, error_msg, True
 
             await self.send_text(msg)
             return True, msg, True
@@ -1329,6 +1857,7 @@ class WorldWarPlugin(BasePlugin):
         """显示世界大战插件的帮助菜单"""
         command_name = "help_command"
         command_description = "显示世界大战插件的帮助菜单"
+        command_verb = "help"
         command_pattern = r"^/help$"
 
         async def execute(self) -> tuple[bool, str | None, bool]:
@@ -1341,6 +1870,7 @@ class WorldWarPlugin(BasePlugin):
         """查看自己国家的信息"""
         command_name = "nation_command"
         command_description = "查看自己国家的信息"
+        command_verb = "nation"
         command_pattern = r"^/nation$"
 
         async def execute(self) -> tuple[bool, str | None, bool]:
@@ -1348,13 +1878,12 @@ class WorldWarPlugin(BasePlugin):
             try:
                 user_id = self.message.message_info.user_info.user_id
             except AttributeError as e:
-                error_msg = "无法获取用户信息。"
+                error_msg = _MSG_NO_USER_INFO
                 await self.send_text(error_msg)
                 return False, error_msg, True
 
-            data_file_path = "./World/data/game_data.json"
             try:
-                game_data = WorldWarPlugin._load_game_data(data_file_path)
+                game_data = await _GameState.aget()
             except Exception as e:
                 error_msg = f"加载游戏数据失败: {e}"
                 await self.send_text(error_msg)
@@ -1373,25 +1902,8 @@ class WorldWarPlugin(BasePlugin):
                  await self.send_text(msg)
                  return True, msg, True
 
-            # 格式化国家信息
-            leader_info = game_data.get("players", {}).get(nation_info.get("leader", ""), {})
-            leader_name = leader_info.get("user_id", "未知") if leader_info else "未知"
-            members_count = len(nation_info.get("members", []))
-            allies_list = get_allies(game_data, player_nation_name)
-            allies_str = ", ".join(allies_list) if allies_list else "无"
-
-            nation_info_str = (
-                f"🌍 国家信息: {player_nation_name}\n"
-                f"🎖️ 领袖: {leader_name}\n"
-                f"👥 成员数: {members_count}\n"
-                f"⚔️ 总兵力: {nation_info.get('troops', 0)}\n"
-                f"🗺️ 领土: {nation_info.get('territory', 0)}\n"
-                f"👥 人口: {nation_info.get('population', 0)}\n"
-                f"🏛️ 制度: {nation_info.get('ideology', '未定')}\n"
-                f"🏕️ 驻军: {nation_info.get('deployed_troops', 0)}\n"
-                f"📈 Elo评分: {nation_info.get('elo', 1500)}\n"
-                f"🤝 盟友: {allies_str}\n"
-            )
+            # 数据未变化时直接复用上次渲染的国家信息
+            nation_info_str = _render_nation_card(player_nation_name, _GameState.version)
 
             await self.send_text(nation_info_str)
             return True, nation_info_str, True
@@ -1401,15 +1913,14 @@ class WorldWarPlugin(BasePlugin):
         """查看世界现状"""
         command_name = "world_command"
         command_description = "查看当前世界中的所有国家及其概况"
+        command_verb = "world"
         command_pattern = r"^/world$"
 
         async def execute(self) -> tuple[bool, str | None, bool]:
             """执行查看世界现状命令"""
-            # 直接使用相对路径
-            data_file_path = "./World/data/game_data.json"
             try:
-                # 直接调用插件类的静态方法加载数据
-                game_data = WorldWarPlugin._load_game_data(data_file_path)
+                # 直接读取进程内共享的游戏数据
+                game_data = await _GameState.aget()
             except Exception as e:
                 error_msg = f"加载游戏数据失败: {e}"
                 await self.send_text(error_msg)
@@ -1424,34 +1935,33 @@ class WorldWarPlugin(BasePlugin):
             """将游戏数据格式化为世界信息字符串"""
             nations = game_data.get("nations", {})
             if not nations:
-                return "🌍 当前世界地图上还没有任何国家。快使用 /join <国家名> 创建或加入一个吧！"
-
-            info_lines = ["🌍 世界现状概览 🌍"]
+                return _EMPTY_WORLD_MSG
+
+            # 一次遍历同时累计全球统计并生成 (兵力, 国家名, 国家数据) 排序行，兵力/领土字段在加载时已补齐
+            rows = []
+            total_troops = total_territory = 0
+            for nation_name, nation_data in nations.items():
+                troops = nation_data['troops']
+                total_troops += troops
+                total_territory += nation_data['territory']
+                rows.append((troops, nation_name, nation_data))
             # 按总兵力降序排序
-            sorted_nations = sorted(nations.items(), key=lambda item: item[1].get('troops', 0), reverse=True)
-            
-            total_troops = sum(nation_data.get('troops', 0) for nation_data in nations.values())
-            total_territory = sum(nation_data.get('territory', 0) for nation_data in nations.values())
+            rows.sort(key=_BY_FIRST, reverse=True)
             total_nations = len(nations)
 
-            info_lines.append(f"📊 全球统计: 共 {total_nations} 个国家, 总兵力 {total_troops}, 总领土 {total_territory}")
-            info_lines.append("-" * 30) # 分隔线
-
-            for i, (nation_name, nation_data) in enumerate(sorted_nations, start=1):
-                leader_id = nation_data.get('leader', '未知')
-                troops = nation_data.get('troops', 0)
-                territory = nation_data.get('territory', 0)
-                ideology = nation_data.get('ideology', '未定')
-                members_count = len(nation_data.get('members', []))
-                deployed_troops = nation_data.get('deployed_troops', 0)
-                
-                # 格式化每行信息
-                info_lines.append(
-                    f"{i}. 🏛️ {nation_name} "
-                    f"(领袖: {leader_id}, 成员: {members_count}, "
-                    f"兵力: {troops}, 驻军: {deployed_troops}, 领土: {territory}, 制度: {ideology})"
-                )
-
+            info_lines = [
+                _WORLD_HEADER,
+                f"📊 全球统计: 共 {total_nations} 个国家, 总兵力 {total_troops}, 总领土 {total_territory}",
+                _WORLD_SEPARATOR,
+            ]
+            # 每个国家一行，每行由一个 f-string 直接生成，最后统一 join 一次
+            info_lines.extend(
+                f"{i}. 🏛️ {nation_name} "
+                f"(领袖: {nation_data.get('leader', '未知')}, 成员: {len(nation_data.get('members', []))}, "
+                f"兵力: {troops}, 驻军: {nation_data['deployed_troops']}, "
+                f"领土: {nation_data['territory']}, 制度: {nation_data.get('ideology', '未定')})"
+                for i, (troops, nation_name, nation_data) in enumerate(rows, start=1)
+            )
             return "\n".join(info_lines)
     # --- 新增结束 ---
 
@@ -1463,74 +1973,76 @@ class WorldWarPlugin(BasePlugin):
         action_description = "触发一个随机的世界事件，例如丰收、瘟疫、技术突破等。"
         activation_type = ActionActivationType.RANDOM # 让麦麦有机会随机触发
         mode_enable = ChatMode.ALL # 在所有聊天模式下都可用
+        # 下一次允许触发事件的时间戳，首次执行时由存档中的 last_event_time 推算，之后每次触发事件时重新抽取
+        _next_event_time: Optional[float] = None
+
+        def _draw_next_event_time(self, last_event_time: float) -> float:
+            """在配置的间隔范围内随机抽取下一次事件时间"""
+            cfg = _Config.get(self)
+            min_interval = cfg.event_min * 60 # 转换为秒
+            max_interval = cfg.event_max * 60 # 转换为秒
+            return last_event_time + min_interval + (max_interval - min_interval) * random.random()
 
         async def execute(self) -> tuple[bool, str | None, bool]:
             """执行随机事件"""
-            # 直接使用硬编码路径和静态方法
-            data_file_path = "./World/data/game_data.json"
-            game_data = WorldWarPlugin._load_game_data(data_file_path)
-
-            # 检查时间间隔 (通过 self.get_config 访问配置)
+            cls = type(self)
             current_time = time.time()
-            last_event_time = game_data.get("last_event_time", 0)
-            min_interval = self.get_config("game.event_interval_min", 60) * 60 # 转换为秒
-            max_interval = self.get_config("game.event_interval_max", 120) * 60 # 转换为秒
-            next_event_time = last_event_time + random.randint(min_interval, max_interval)
-
-            if current_time < next_event_time:
-                # 时间未到，不触发
+            # 时间未到时只比较一次时间戳就返回，不读取游戏数据也不读取配置
+            if cls._next_event_time is not None and current_time < cls._next_event_time:
                 return False, None, False
 
+            game_data = await _GameState.aget()
+
+            if cls._next_event_time is None:
+                cls._next_event_time = self._draw_next_event_time(game_data.get("last_event_time", 0))
+                if current_time < cls._next_event_time:
+                    # 时间未到，不触发
+                    return False, None, False
+
             # 时间到了，尝试触发事件
-            if not game_data["nations"]:
+            nation_names = get_nation_names(game_data)
+            if not nation_names:
                 return False, None, False # 没有国家，不执行
 
             # 选择一个随机国家
-            target_nation_name = random.choice(list(game_data["nations"].keys()))
+            target_nation_name = random.choice(nation_names)
             target_nation_info = game_data["nations"][target_nation_name]
 
-            # 选择一个随机事件
-            event = random.choice(RANDOM_EVENTS)
-            effect_path_str = event["effect"]
-            multiplier = event["multiplier"]
-
-            # 解析 effect 路径 (例如 "nation.troops")
-            effect_path = effect_path_str.split('.')
-            if len(effect_path) != 2 or effect_path[0] != 'nation':
-                print(f"随机事件 '{event['name']}' 的 effect 路径无效: {effect_path_str}")
-                return False, None, False
+            # 选择一个随机事件 (effect 路径已在模块加载时解析)
+            event_name, event_desc, stat_key, multiplier, floored = random.choice(_COMPILED_EVENTS)
 
-            stat_key = effect_path[1]
             if stat_key not in target_nation_info:
-                 print(f"随机事件 '{event['name']}' 试图修改不存在的国家属性: {stat_key}")
+                 print(f"随机事件 '{event_name}' 试图修改不存在的国家属性: {stat_key}")
                  return False, None, False
 
             old_value = target_nation_info[stat_key]
             # 应用效果 (使用 int 确保整数结果，特别是对于 troops)
             new_value = int(old_value * multiplier)
             # 确保一些关键值不会变为0或负数
-            if stat_key in ['troops', 'territory', 'population']:
+            if floored:
                 new_value = max(1, new_value)
             target_nation_info[stat_key] = new_value
 
-            # 更新最后事件时间
+            # 更新最后事件时间，并抽取下一次事件时间
             game_data["last_event_time"] = current_time
+            cls._next_event_time = self._draw_next_event_time(current_time)
 
             # 构造事件消息
-            event_msg = f"🌍 全球事件: {event['name']} 发生在 {target_nation_name}！{event['description']}该国的{stat_key}从 {old_value} 变为 {new_value}。"
+            event_msg = f"🌍 全球事件: {event_name} 发生在 {target_nation_name}！{event_desc}该国的{stat_key}从 {old_value} 变为 {new_value}。"
 
             # 保存数据
             try:
-                WorldWarPlugin._save_game_data(game_data, data_file_path)
+                await _GameState.commit(nations=[target_nation_name], last_event_time=True)
             except Exception as e:
                 print(f"随机事件保存数据失败: {e}")
                 # 即使保存失败，也尝试广播消息
 
             # 广播到公屏 (调用静态方法)
+            cfg = _Config.get(self)
             await WorldWarPlugin.broadcast_to_public_static(
                 event_msg,
-                self.get_config("game.announcement_chat_id", "12345678"),
-                self.get_config("game.enable_public_announcements", True)
+                cfg.announce_chat,
+                cfg.announce_enabled
             )
 
             return True, event_msg, True # 执行成功，发送了消息，拦截（如果需要的话）